@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cold vs warm crawl check for the Kifal scraper's persistent HTTP cache, against a local stand-in site
+
+Usage (from backend/): python benchmark_http_cache.py [brands]
+The stand-in sends ETags on every page except the homepage, so a warm crawl exercises both
+304 revalidation and the content hash check. Exits non-zero if the crawls disagree.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import tempfile
+import time
+from aiohttp import web
+from scrapers.kifal_scraper import KifalDataScraper
+
+def stand_in_app(brands: list) -> web.Application:
+    """A homepage, a brand select search page and one listing page per brand, shaped like Kifal's"""
+    known = {name.upper() for name in brands}
+
+    async def home(request):
+        links = "".join(f'<a href="/search?marque={name.lower()}"><img src="/imgs/brands/{name}.webp"></a>'
+                        for name in brands[:1])
+        return web.Response(text=f"<html><nav>{links}</nav></html>", content_type="text/html")
+
+    async def search(request):
+        brand = request.query.get("marque", "")
+        if not brand:
+            options = "".join(f"<option>{name.title()}</option>" for name in brands[1:])
+            return web.Response(text=f'<select name="marque"><option>Tous</option>{options}</select>',
+                                content_type="text/html")
+        if brand.upper() not in known:
+            return web.Response(text="aucun résultat", content_type="text/html")
+        return web.Response(
+            text=f'<div class="card"><a href="/c/{brand}-x">{brand} Sport 1.6 Prix: 250 000 DH</a></div>'
+                 f'<a href="/m/{brand}-y">{brand} Touring 199 000 DH</a>',
+            content_type="text/html")
+
+    @web.middleware
+    async def etags(request, handler):
+        response = await handler(request)
+        if request.path == "/":
+            return response
+        tag = '"' + hashlib.md5(response.text.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == tag:
+            return web.Response(status=304, headers={"ETag": tag})
+        response.headers["ETag"] = tag
+        return response
+
+    app = web.Application(middlewares=[etags])
+    app.router.add_get("/", home)
+    app.router.add_get("/search", search)
+    return app
+
+async def crawl(base_url: str, http_cache_dir) -> tuple:
+    """Scraped data without its timestamp, plus the crawl's throughput stats"""
+    scraper = KifalDataScraper(requests_per_second=1000, burst=1000, http_cache_dir=http_cache_dir,
+                               journal_path=None, base_url=base_url)
+    data = await scraper.scrape_complete_data()
+    data["metadata"].pop("scraped_at", None)
+    return json.dumps(data, sort_keys=True), scraper.throughput()
+
+async def run(brands: list) -> bool:
+    runner = web.AppRunner(stand_in_app(brands))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+    try:
+        reference, _ = await crawl(base_url, None)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results = {}
+            for name in ("cold", "warm"):
+                start = time.perf_counter()
+                output, stats = await crawl(base_url, cache_dir)
+                results[name] = (output, stats, time.perf_counter() - start)
+    finally:
+        await runner.cleanup()
+
+    print(f"🌐 Stand-in at {base_url} with {len(brands)} brands")
+    for name, (output, stats, seconds) in results.items():
+        print(f"   {name}: {stats['pages']} pages, {stats['not_modified']} not modified, "
+              f"{stats['unchanged']} unchanged, {stats['parsed']} parsed in {seconds:.2f}s")
+
+    ok = True
+    for name, (output, _, _) in results.items():
+        if output != reference:
+            ok = False
+            print(f"❌ {name} crawl output differs from an uncached crawl")
+    if results["warm"][1]["parsed"]:
+        ok = False
+        print(f"❌ Warm crawl parsed {results['warm'][1]['parsed']} page(s), expected 0")
+    if ok:
+        print("✅ Cached crawls match an uncached crawl, and the warm crawl parsed no pages")
+    return ok
+
+def main():
+    logging.disable(logging.WARNING)
+    brands = sys.argv[1].split(",") if len(sys.argv) > 1 else ["PEUGEOT", "FIAT", "BMW", "DACIA", "KIA", "TOYOTA", "RENAULT"]
+    return 0 if asyncio.run(run(brands)) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
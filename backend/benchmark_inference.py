@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Parity check and latency benchmark for the MLModel inference paths
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from models.ml_model import MLModel
+
+def load_samples(n: int = 500) -> list:
+    """Build prediction inputs from the used cars dataset"""
+    df = pd.read_csv("data/csv/morocco_used_cars.csv").sample(n, random_state=42)
+    owners = ["First Owner", "Second Owner", "Third Owner"]
+    return [
+        {
+            "Brand": row["Brand"],
+            "Model": row["Model"],
+            "Year": int(row["Year"]),
+            "KM_Driven": int(row["KM_Driven"]),
+            "Fuel": row["Fuel_Type"],
+            "Transmission": row["Transmission"],
+            "Seller_Type": row["Seller_Type"],
+            "Owner": owners[i % len(owners)]
+        }
+        for i, (_, row) in enumerate(df.iterrows())
+    ]
+
+def time_per_call(func, samples: list) -> float:
+    """Average seconds per call over all samples"""
+    start = time.perf_counter()
+    for sample in samples:
+        func(sample)
+    return (time.perf_counter() - start) / len(samples)
+
+def check_parity(name: str, reference: list, actual: list) -> bool:
+    """Compare two lists of prediction results"""
+    for key in ("price", "confidence", "rf_prediction", "gb_prediction"):
+        expected_values = np.array([r[key] for r in reference])
+        actual_values = np.array([r[key] for r in actual])
+        if not np.allclose(expected_values, actual_values, rtol=1e-9, atol=0):
+            print(f"❌ {name} mismatch on {key}: max diff {np.max(np.abs(expected_values - actual_values))}")
+            return False
+    
+    print(f"✅ {name} matches the sklearn pandas path on {len(reference)} cars")
+    return True
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "models/car_price_model.joblib"
+    model = MLModel(model_path=model_path, inference_engine="sklearn")
+    compiled_model = MLModel(model_path=model_path, inference_engine="compiled")
+    
+    if not model.is_loaded():
+        print(f"❌ No trained model at {model_path}")
+        return 1
+    if not model.fast_path:
+        print("⚠️  This model artifact does not support the fast inference path")
+        return 1
+    
+    samples = load_samples()
+    reference = model.predict_many(samples)
+    if not check_parity("Fast path", reference, [model.predict_fast(s) for s in samples]):
+        return 1
+    if compiled_model.compiled is not None:
+        if not check_parity("Compiled single-car path", reference, [compiled_model.predict_fast(s) for s in samples]):
+            return 1
+        if not check_parity("Compiled batch path", reference, compiled_model.predict_many(samples)):
+            return 1
+    
+    print("⏱️  Single-car latency:")
+    pandas_time = time_per_call(lambda s: model.predict_many([s]), samples)
+    print(f"   sklearn pandas pipeline: {pandas_time * 1e3:.3f} ms")
+    fast_time = time_per_call(model.predict_fast, samples)
+    print(f"   sklearn fast path:       {fast_time * 1e3:.3f} ms ({pandas_time / fast_time:.1f}x)")
+    if compiled_model.compiled is not None:
+        compiled_time = time_per_call(compiled_model.predict_fast, samples)
+        print(f"   compiled fast path:      {compiled_time * 1e3:.3f} ms ({pandas_time / compiled_time:.1f}x)")
+    
+    print(f"⏱️  Batch of {len(samples)} cars:")
+    start = time.perf_counter()
+    model.predict_many(samples)
+    sklearn_batch = time.perf_counter() - start
+    print(f"   sklearn:  {sklearn_batch * 1e3:.1f} ms")
+    if compiled_model.compiled is not None:
+        start = time.perf_counter()
+        compiled_model.predict_many(samples)
+        compiled_batch = time.perf_counter() - start
+        print(f"   compiled: {compiled_batch * 1e3:.1f} ms ({sklearn_batch / compiled_batch:.1f}x)")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
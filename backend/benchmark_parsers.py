@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Parity check and per-page parse + extract benchmark for the Kifal HTML parser backends
+
+Usage (from backend/): python benchmark_parsers.py [fixtures_dir] [brand]
+Fixtures default to the pages saved by the Kifal scraper's HTTP cache.
+"""
+import sys
+import time
+from pathlib import Path
+from scrapers.html_parsers import PARSER_BACKENDS, SoupDocument
+from scrapers.kifal_scraper import KifalDataScraper
+
+def synthetic_listing_page(cards: int = 300) -> str:
+    """A brand search page shaped like Kifal's, for when no saved pages are available"""
+    brands = "".join(
+        f'<a href="/search?marque={name}"><img src="/imgs/brands/{name}.webp"></a>'
+        for name in ("BMW", "DACIA", "RENAULT", "TOYOTA", "LAND%20ROVER")
+    )
+    options = "".join(f"<option>{name}</option>" for name in ("Tous", "BMW", "Dacia", "Renault", "Toyota"))
+    listings = "".join(
+        f'<article class="car-card"><a href="/voiture/{i}"><img src="/imgs/{i}.webp">'
+        f'<h3>BMW Serie {i % 8 + 1}</h3></a><div class="price">{250 + i} 000 DH</div>'
+        f'<script>track({i})</script><!-- card {i} --></article>'
+        for i in range(cards)
+    )
+    return (
+        "<html><head><title>Kifal</title><style>.car-card{}</style></head><body>"
+        f"<nav>{brands}</nav><form><select name=\"marque\">{options}</select></form>"
+        f"<section class=\"listing\">{listings}</section></body></html>"
+    )
+
+def load_pages(fixtures_dir: str) -> list:
+    """HTML bodies saved under fixtures_dir, or one synthetic listing page"""
+    paths = sorted(Path(fixtures_dir).glob("*.html"))
+    if not paths:
+        print(f"⚠️  No saved pages in {fixtures_dir}, using a synthetic listing page")
+        return [("synthetic", synthetic_listing_page())]
+    return [(path.name, path.read_text(encoding="utf-8")) for path in paths]
+
+def extract_all(scraper: KifalDataScraper, html: str, brand: str) -> tuple:
+    """Parse a page and run every Kifal extractor over it"""
+    document = scraper.document_class(html)
+    return (
+        scraper.extract_brands_from_page(document),
+        scraper.extract_brands_from_search_page(document),
+        scraper.is_empty_results_page(document),
+        scraper.extract_models_from_page(document, brand)
+    )
+
+def time_per_page(scraper: KifalDataScraper, pages: list, brand: str, rounds: int = 5) -> float:
+    """Best-of-rounds average seconds per page"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _, html in pages:
+            extract_all(scraper, html, brand)
+        best = min(best, (time.perf_counter() - start) / len(pages))
+    return best
+
+def main():
+    fixtures_dir = sys.argv[1] if len(sys.argv) > 1 else "data/cache/kifal_http/bodies"
+    brand = sys.argv[2].upper() if len(sys.argv) > 2 else "BMW"
+    pages = load_pages(fixtures_dir)
+    scrapers = {name: KifalDataScraper(http_cache_dir=None, parser=name) for name in PARSER_BACKENDS}
+    reference = scrapers[SoupDocument.name]
+
+    parity = True
+    for name, scraper in scrapers.items():
+        if scraper is reference:
+            continue
+        mismatches = [page for page, html in pages
+                      if extract_all(scraper, html, brand) != extract_all(reference, html, brand)]
+        if mismatches:
+            parity = False
+            print(f"❌ {name} differs from {reference.parser} on {len(mismatches)} page(s): {', '.join(mismatches[:5])}")
+        else:
+            print(f"✅ {name} matches {reference.parser} on {len(pages)} page(s)")
+
+    print(f"⏱️  Parse + extract per page ({sum(len(html) for _, html in pages) // len(pages) // 1024} KiB average):")
+    reference_time = time_per_page(reference, pages, brand)
+    for name, scraper in scrapers.items():
+        page_time = reference_time if scraper is reference else time_per_page(scraper, pages, brand)
+        print(f"   {name:<12} {page_time * 1e3:8.3f} ms ({reference_time / page_time:.1f}x)")
+
+    return 0 if parity else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
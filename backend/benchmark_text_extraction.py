@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Agreement check and throughput benchmark for the single-pass listing text extractor
+
+Usage (from backend/): python benchmark_text_extraction.py [kifal_scraped_data.json]
+Without scraped data, a synthetic corpus of listing texts is used.
+"""
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from scrapers.listing_text import extract_listing_details
+
+def legacy_extract_price(text: str):
+    """Price extraction as the Kifal scraper did it: one findall per pattern"""
+    try:
+        for pattern in [
+            r'(\d{1,3}(?:\s?\d{3})*)\s*(?:DH|MAD|Dh)',
+            r'(\d{1,3}(?:,\d{3})*)\s*(?:DH|MAD|Dh)',
+            r'(\d{3,})\s*(?:DH|MAD|Dh)',
+            r'Prix\s*:?\s*(\d{1,3}(?:\s?\d{3})*)',
+        ]:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if matches:
+                price = int(matches[0].replace(' ', '').replace(',', ''))
+                if 50000 <= price <= 5000000:
+                    return price
+    except (ValueError, AttributeError):
+        pass
+    return None
+
+def legacy_extract_details(text: str) -> dict:
+    """Year/engine/fuel/transmission extraction as the Kifal processor did it: one search per field"""
+    year_match = re.search(r'20\d{2}', text)
+    engine_match = re.search(r'(\d+\.\d+|\d+)\s*(L|l|TSI|TDI|HDI|DCI)', text, re.IGNORECASE)
+    fuel_type = next((fuel for fuel in ['ESSENCE', 'DIESEL', 'HYBRID', 'ELECTRIQUE', 'GPL']
+                      if fuel.lower() in text.lower()), None)
+    if any(term in text.upper() for term in ['AUTO', 'AUTOMATIQUE', 'CVT', 'DSG']):
+        transmission = 'AUTOMATIQUE'
+    elif any(term in text.upper() for term in ['MANUEL', 'MANUELLE', 'MT']):
+        transmission = 'MANUELLE'
+    else:
+        transmission = None
+    return {
+        'price': legacy_extract_price(text),
+        'year': int(year_match.group()) if year_match else None,
+        'engine': engine_match.group().upper() if engine_match else None,
+        'fuel_type': fuel_type,
+        'transmission': transmission
+    }
+
+def synthetic_corpus(n: int = 20000) -> list:
+    """Listing texts in the shapes Kifal pages produce"""
+    rng = random.Random(42)
+    brands = ['BMW', 'DACIA', 'RENAULT', 'TOYOTA', 'PEUGEOT', 'VOLKSWAGEN', 'HYUNDAI']
+    models = ['Serie 3', 'Duster', 'Clio', 'Corolla', '208', 'Golf', 'Tucson']
+    engines = ['1.0 L', '1.5 dCi', '2.0 TDI', '1.4 TSI', '1.6 HDi', '']
+    fuels = ['Essence', 'Diesel', 'Hybrid', 'Electrique', '']
+    gearboxes = ['Automatique', 'Manuelle', 'BVA', '']
+    texts = []
+    for _ in range(n):
+        price = rng.randrange(90, 1800) * 1000
+        amount = rng.choice([f"{price:,}".replace(',', ' '), f"{price:,}", str(price)])
+        price_text = rng.choice([f"{amount} DH", f"{amount} MAD", f"Prix: {amount}", f"A partir de {amount} Dh"])
+        parts = [rng.choice(brands), rng.choice(models), rng.choice(engines), rng.choice(fuels),
+                 rng.choice(gearboxes), rng.choice(['', str(rng.randrange(2018, 2026))]), price_text]
+        texts.append(' '.join(part for part in parts if part))
+    return texts
+
+def load_corpus(path: str) -> list:
+    """raw_text of every scraped model, or a synthetic corpus when there is no scraped data"""
+    if path and Path(path).exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        texts = [variation.get('raw_text', '') for models in data.get('models', {}).values()
+                 for variations in models.values() for variation in variations]
+        if texts:
+            return texts
+    print("⚠️  No scraped raw texts found, using a synthetic corpus")
+    return synthetic_corpus()
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "data/json/kifal_scraped_data.json"
+    texts = load_corpus(path)
+
+    differences = {}
+    examples = {}
+    for text in texts:
+        expected, actual = legacy_extract_details(text), extract_listing_details(text)
+        for field in expected:
+            if expected[field] != actual[field]:
+                differences[field] = differences.get(field, 0) + 1
+                examples.setdefault(field, (text, expected[field], actual[field]))
+    if differences:
+        print(f"⚠️  Differences from the per-field extractors on {len(texts)} texts:")
+        for field, count in differences.items():
+            text, expected, actual = examples[field]
+            print(f"   {field}: {count} (e.g. {text!r}: {expected!r} -> {actual!r})")
+    else:
+        print(f"✅ Single-pass extractor agrees with the per-field extractors on {len(texts)} texts")
+
+    print(f"⏱️  Throughput over {len(texts)} texts:")
+    start = time.perf_counter()
+    for text in texts:
+        legacy_extract_details(text)
+    legacy_time = time.perf_counter() - start
+    print(f"   per-field regexes: {len(texts) / legacy_time:10.0f} texts/sec")
+    start = time.perf_counter()
+    for text in texts:
+        extract_listing_details(text)
+    single_pass_time = time.perf_counter() - start
+    print(f"   single pass:       {len(texts) / single_pass_time:10.0f} texts/sec ({legacy_time / single_pass_time:.1f}x)")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
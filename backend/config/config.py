@@ -16,15 +16,32 @@ MODEL_PATH = os.getenv("MODEL_PATH", "car_price_model.joblib")
 MIN_TRAINING_SAMPLES = int(os.getenv("MIN_TRAINING_SAMPLES", 50))
 MAX_PRICE = int(os.getenv("MAX_PRICE", 2000000))  # Maximum reasonable car price in MAD
 MIN_PRICE = int(os.getenv("MIN_PRICE", 10000))    # Minimum reasonable car price in MAD
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "compiled")  # "compiled" (flat tree arrays) or "sklearn"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 10000))  # cached /predict answers, 0 disables
+PREDICTION_CACHE_TTL = int(os.getenv("PREDICTION_CACHE_TTL", 3600))  # seconds
+PREDICTION_CACHE_KM_BUCKET = int(os.getenv("PREDICTION_CACHE_KM_BUCKET", 0))  # round km_driven to this step, 0 keeps exact km
 
 # Scraping Configuration
 SCRAPING_TIMEOUT = int(os.getenv("SCRAPING_TIMEOUT", 30))  # seconds
 MAX_LISTINGS_PER_SOURCE = int(os.getenv("MAX_LISTINGS", 15))
 CACHE_TTL = int(os.getenv("CACHE_TTL", 900))  # 15 minutes in seconds
+SCRAPE_CACHE_STALE_TTL = int(os.getenv("SCRAPE_CACHE_STALE_TTL", 900))  # serve past CACHE_TTL while refreshing
+SCRAPY_WORKERS = int(os.getenv("SCRAPY_WORKERS", 1))  # long-lived Scrapy worker processes, each runs many crawls
+SCRAPE_MAX_CONCURRENT_JOBS = int(os.getenv("SCRAPE_MAX_CONCURRENT_JOBS", 2))  # /search-cars jobs running at once
+SCRAPE_MAX_PENDING_JOBS = int(os.getenv("SCRAPE_MAX_PENDING_JOBS", 20))  # queued + running jobs before 429
+SCRAPE_JOB_TTL = int(os.getenv("SCRAPE_JOB_TTL", 3600))  # seconds a finished job's results are kept
 FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_THRESHOLD", 0.6))
 
+# Catalog lookup responses (/brands, /new-cars/brands, ...) are immutable per data load
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", 300))  # seconds
+
+# Hot reload of the catalog files and model artifact
+DATA_RELOAD_INTERVAL = int(os.getenv("DATA_RELOAD_INTERVAL", 0))  # seconds between file change checks, 0 disables watching
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # required in X-Admin-Token by POST /admin/reload, which is disabled while unset
+
 # Request Configuration
 MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # 10MB
+MAX_BATCH_PREDICTIONS = int(os.getenv("MAX_BATCH_PREDICTIONS", 10000))  # cars per /predict/batch call
 
 # CORS Configuration
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
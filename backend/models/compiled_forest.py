@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Flat NumPy export of the RF + GB price ensemble for fast inference
+"""
+
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class FlatForest:
+    """The trees of one ensemble packed into contiguous node arrays"""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, base: float, scale: float):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.base = float(base)
+        self.scale = float(scale)
+        # Interleaved [left, right] pairs: the next node is children[2 * node + went_right]
+        self.children = np.stack([left, right], axis=1).ravel()
+
+    @classmethod
+    def from_trees(cls, trees: List, base: float, scale: float) -> 'FlatForest':
+        """Concatenate fitted sklearn trees; leaves loop onto themselves so traversal needs no branching"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for tree in trees:
+            t = tree.tree_
+            n = t.node_count
+            is_leaf = t.children_left == -1
+            own_index = np.arange(offset, offset + n, dtype=np.int32)
+
+            features.append(np.where(is_leaf, 0, t.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, t.threshold))
+            lefts.append(np.where(is_leaf, own_index, t.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, own_index, t.children_right + offset).astype(np.int32))
+            values.append(t.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, t.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            max_depth=max_depth,
+            base=base,
+            scale=scale,
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Raw ensemble output: base + scale * sum of leaf values, for every row of X"""
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        flat_X = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+
+        # One step down every tree for every row at once; leaves point back to themselves
+        for _ in range(self.max_depth):
+            went_right = ~(flat_X[row_offsets + self.feature[node]] <= self.threshold[node])
+            node = self.children[2 * node + went_right]
+
+        return self.base + self.scale * self.value[node].sum(axis=1)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f'{prefix}_feature': self.feature,
+            f'{prefix}_threshold': self.threshold,
+            f'{prefix}_left': self.left,
+            f'{prefix}_right': self.right,
+            f'{prefix}_value': self.value,
+            f'{prefix}_roots': self.roots,
+            f'{prefix}_params': np.array([self.max_depth, self.base, self.scale], dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> 'FlatForest':
+        max_depth, base, scale = arrays[f'{prefix}_params']
+        return cls(
+            feature=arrays[f'{prefix}_feature'],
+            threshold=arrays[f'{prefix}_threshold'],
+            left=arrays[f'{prefix}_left'],
+            right=arrays[f'{prefix}_right'],
+            value=arrays[f'{prefix}_value'],
+            roots=arrays[f'{prefix}_roots'],
+            max_depth=max_depth,
+            base=base,
+            scale=scale,
+        )
+
+
+class CompiledEnsemble:
+    """RF + GB price ensemble evaluated from flat arrays, target transform and weights included"""
+
+    INVERSE_FUNCS = {
+        'expm1': np.expm1,
+        'identity': lambda y: y,
+    }
+
+    def __init__(self, rf: FlatForest, gb: FlatForest, weights: List[float], inverse: str):
+        if inverse not in self.INVERSE_FUNCS:
+            raise ValueError(f"Unsupported target transform: {inverse}")
+        self.rf = rf
+        self.gb = gb
+        self.weights = [float(w) for w in weights]
+        self.inverse = inverse
+        self.inverse_func = self.INVERSE_FUNCS[inverse]
+
+    @classmethod
+    def from_model(cls, model: Dict) -> 'CompiledEnsemble':
+        """Flatten the {'rf': ..., 'gb': ..., 'weights': ...} ensemble built by MLModel.train"""
+        rf_ttr, gb_ttr = model['rf'], model['gb']
+
+        inverses = set()
+        for ttr in (rf_ttr, gb_ttr):
+            if ttr.inverse_func is np.expm1:
+                inverses.add('expm1')
+            elif ttr.func is None and ttr.inverse_func is None and ttr.transformer is None:
+                inverses.add('identity')
+            else:
+                raise ValueError("Only log1p/expm1 or identity target transforms can be compiled")
+        if len(inverses) != 1:
+            raise ValueError("RF and GB must share the same target transform")
+
+        rf_est = rf_ttr.regressor_.named_steps['est']
+        gb_est = gb_ttr.regressor_.named_steps['est']
+
+        if gb_est.init_ == 'zero':
+            gb_base = 0.0
+        elif hasattr(gb_est.init_, 'constant_'):
+            gb_base = float(np.ravel(gb_est.init_.constant_)[0])
+        else:
+            raise ValueError("Only constant GradientBoosting init estimators can be compiled")
+
+        rf = FlatForest.from_trees(rf_est.estimators_, base=0.0, scale=1.0 / len(rf_est.estimators_))
+        gb = FlatForest.from_trees([stage[0] for stage in gb_est.estimators_], base=gb_base,
+                                   scale=gb_est.learning_rate)
+
+        return cls(rf, gb, model['weights'], inverses.pop())
+
+    def predict_components(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """RF and GB price predictions for preprocessed feature rows"""
+        return self.inverse_func(self.rf.predict(X)), self.inverse_func(self.gb.predict(X))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Weighted ensemble price for preprocessed feature rows"""
+        rf_pred, gb_pred = self.predict_components(X)
+        return self.weights[0] * rf_pred + self.weights[1] * gb_pred
+
+    def save(self, path: str):
+        arrays = {**self.rf.to_arrays('rf'), **self.gb.to_arrays('gb')}
+        np.savez(path, weights=np.array(self.weights), inverse=np.array(self.inverse), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledEnsemble':
+        with np.load(path) as arrays:
+            return cls(
+                FlatForest.from_arrays(arrays, 'rf'),
+                FlatForest.from_arrays(arrays, 'gb'),
+                list(arrays['weights']),
+                str(arrays['inverse']),
+            )
+
+
+def main():
+    """Export the trained model's ensemble next to its joblib artifact"""
+    from models.ml_model import MLModel
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "models/car_price_model.joblib"
+    model = MLModel(model_path=model_path)
+
+    if not model.is_loaded():
+        print(f"❌ No trained model at {model_path}")
+        return 1
+
+    try:
+        path = model.export_compiled()
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        print(f"❌ This model artifact cannot be compiled: {e}")
+        return 1
+
+    print(f"💾 Compiled ensemble saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
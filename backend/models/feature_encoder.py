@@ -0,0 +1,105 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder
+
+
+def to_number(value: Any) -> float:
+    """Scalar equivalent of pd.to_numeric(errors='coerce')"""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def engineer_features(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Scalar equivalent of MLModel.preprocess_data(is_training=False) for one car"""
+    row = dict(data)
+
+    if 'Year' in row:
+        row['Year'] = to_number(row['Year'])
+        row['Car_Age'] = datetime.now().year - row['Year']
+
+    if 'KM_Driven' in row:
+        row['KM_Driven'] = to_number(row['KM_Driven'])
+        age = row.get('Car_Age', 1)
+        row['KM_Per_Year'] = row['KM_Driven'] / ((1 if age == 0 else age) + 1)
+
+    # Numeric NaNs become 0 at prediction time
+    for col in ('Year', 'KM_Driven', 'Car_Age', 'KM_Per_Year'):
+        if col in row and math.isnan(row[col]):
+            row[col] = 0
+
+    return row
+
+
+class CompiledFeatureEncoder:
+    """Encode one car straight into the feature row a fitted ColumnTransformer would produce"""
+
+    def __init__(self, preprocessor: ColumnTransformer, feature_columns: List[str]):
+        self.feature_columns = list(feature_columns)
+        # (kind, column, offset, lookup, default) per input column that reaches the output
+        self.steps = []
+        offset = 0
+
+        for _, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop':
+                continue
+            names = [self.feature_columns[c] if isinstance(c, (int, np.integer)) else c for c in columns]
+
+            # Newer sklearn stores passthrough as an identity FunctionTransformer
+            if transformer == 'passthrough' or (isinstance(transformer, FunctionTransformer) and transformer.func is None):
+                for name in names:
+                    self.steps.append(('number', name, offset, None, None))
+                    offset += 1
+
+            elif isinstance(transformer, OneHotEncoder):
+                if transformer.drop_idx_ is not None or transformer.handle_unknown != 'ignore':
+                    raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop is supported")
+                for name, categories in zip(names, transformer.categories_):
+                    positions = {value: i for i, value in enumerate(categories)}
+                    self.steps.append(('onehot', name, offset, positions, None))
+                    offset += len(categories)
+
+            elif isinstance(transformer, OrdinalEncoder):
+                for name, categories in zip(names, transformer.categories_):
+                    codes = {value: float(i) for i, value in enumerate(categories)}
+                    unknown = transformer.unknown_value if transformer.handle_unknown == 'use_encoded_value' else math.nan
+                    self.steps.append(('ordinal', name, offset, codes, float(unknown)))
+                    offset += 1
+
+            else:
+                raise ValueError(f"Unsupported transformer: {type(transformer).__name__}")
+
+        self.n_features = offset
+
+    def categories(self, name: str) -> List[Any]:
+        """Values the fitted encoder knows for a categorical column, in encoding order"""
+        for kind, column, _, lookup, _ in self.steps:
+            if column == name and lookup is not None:
+                return sorted(lookup, key=lookup.get)
+        return []
+
+    def encode(self, data: Dict[str, Any]) -> np.ndarray:
+        """Return the preprocessed feature row for one car, as a (1, n_features) array"""
+        row = engineer_features(data)
+        features = np.zeros((1, self.n_features))
+
+        for kind, name, offset, lookup, default in self.steps:
+            # Columns absent from the input are filled with 0, like MLModel.predict_many
+            value = row.get(name, 0)
+            if kind == 'number':
+                features[0, offset] = value
+            elif kind == 'onehot':
+                position = lookup.get(value)
+                if position is not None:
+                    features[0, offset + position] = 1.0
+            else:
+                features[0, offset] = lookup.get(value, default)
+
+        return features
@@ -13,16 +13,36 @@ import logging
 from typing import Dict, Any, Optional, List
 import os
 from datetime import datetime
+from models.feature_encoder import CompiledFeatureEncoder
+from models.compiled_forest import CompiledEnsemble
+from models.prediction_cache import PredictionCache
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_PATH = "models/car_price_model.joblib"
+
+def compiled_model_path(model_path: str) -> str:
+    """Where the flat ensemble exported from a model artifact is saved"""
+    return os.path.splitext(model_path)[0] + ".forest.npz"
+
 class MLModel:
-    def __init__(self, model_path: str = "models/car_price_model.joblib"):
+    INFERENCE_ENGINES = ('sklearn', 'compiled')
+    
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, inference_engine: str = "sklearn",
+                 prediction_cache: Optional[PredictionCache] = None):
+        if inference_engine not in self.INFERENCE_ENGINES:
+            raise ValueError(f"Unknown inference engine: {inference_engine}")
+        
         self.model_path = model_path
+        self.compiled_model_path = compiled_model_path(model_path)
+        self.inference_engine = inference_engine
         self.model = None
         self.preprocessor = None
         self.feature_columns: List[str] = []
         self.is_trained = False
+        self.fast_path: Optional[Dict[str, Any]] = None
+        self.compiled: Optional[CompiledEnsemble] = None
+        self.prediction_cache = prediction_cache
         
         # Try to load existing model
         self.load_model()
@@ -113,7 +133,7 @@ class MLModel:
 
             transformers = []
             if categorical_ohe:
-                transformers.append(('ohe', OneHotEncoder(handle_unknown='ignore', sparse=False), categorical_ohe))
+                transformers.append(('ohe', OneHotEncoder(handle_unknown='ignore', sparse_output=False), categorical_ohe))
             if model_cardinality:
                 transformers.append(('model_ord', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1), model_cardinality))
 
@@ -152,6 +172,10 @@ class MLModel:
             accuracy = max(0, (1 - mae / mean_price)) * 100
             
             self.is_trained = True
+            self.fast_path = self.compile_fast_path()
+            self.compiled = self.compile_ensemble() if self.inference_engine == 'compiled' else None
+            if self.prediction_cache is not None:
+                self.prediction_cache.clear()
             
             # Save model
             self.save_model()
@@ -166,19 +190,37 @@ class MLModel:
     
     def predict(self, car_data) -> Dict[str, Any]:
         """Make prediction for a single car"""
+        # Pydantic model or dictionary
+        data_dict = car_data.dict() if hasattr(car_data, 'dict') else car_data
+        
+        # Repeat queries are answered without touching the ensemble
+        cache_key = None
+        if self.prediction_cache is not None:
+            cache_key, data_dict = self.prediction_cache.normalize(data_dict)
+            cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.fast_path:
+            result = self.predict_fast(data_dict)
+        else:
+            result = self.predict_many([data_dict])[0]
+        
+        if cache_key is not None:
+            self.prediction_cache.set(cache_key, result)
+        
+        logger.info(f"Prediction: {result['price']:.0f} MAD (confidence: {result['confidence']:.2f})")
+        
+        return result
+    
+    def predict_many(self, cars) -> List[Dict[str, Any]]:
+        """Make predictions for many cars with one vectorized pass per model"""
         if not self.is_trained or not self.model:
             raise ValueError("Model is not trained")
         
         try:
-            # Convert input to DataFrame
-            if hasattr(car_data, 'dict'):
-                # Pydantic model
-                data_dict = car_data.dict()
-            else:
-                # Dictionary
-                data_dict = car_data
-            
-            df = pd.DataFrame([data_dict])
+            # Accept a DataFrame or a list of dictionaries
+            df = cars if isinstance(cars, pd.DataFrame) else pd.DataFrame(list(cars))
 
             # Preprocess engineered features
             df_processed = self.preprocess_data(df, is_training=False)
@@ -190,33 +232,122 @@ class MLModel:
 
             X = df_processed[self.feature_columns]
 
-            # Make predictions with ensemble (pipelines handle preprocessing and target inverse transform)
-            rf_pred = self.model['rf'].predict(X)[0]
-            gb_pred = self.model['gb'].predict(X)[0]
-            
-            ensemble_pred = (self.model['weights'][0] * rf_pred + 
-                           self.model['weights'][1] * gb_pred)
+            if self.compiled is not None:
+                # Flat tree arrays over the fitted preprocessor's output
+                features = self.fast_path['rf']['preprocessor'].transform(X)
+                rf_pred, gb_pred = self.compiled.predict_components(features)
+            else:
+                # Make predictions with ensemble (pipelines handle preprocessing and target inverse transform)
+                rf_pred = np.asarray(self.model['rf'].predict(X), dtype=float)
+                gb_pred = np.asarray(self.model['gb'].predict(X), dtype=float)
             
-            # Calculate confidence based on individual model agreement
-            pred_diff = abs(rf_pred - gb_pred)
-            max_diff = max(rf_pred, gb_pred) * 0.3  # 30% difference threshold
-            confidence = max(0.5, 1 - (pred_diff / max_diff)) if max_diff > 0 else 0.9
+            return self.combine_predictions(rf_pred, gb_pred)
             
-            result = {
-                'price': max(10000, float(ensemble_pred)),  # Minimum reasonable price
-                'confidence': min(0.95, confidence),  # Cap confidence at 95%
-                'rf_prediction': rf_pred,
-                'gb_prediction': gb_pred
-            }
+        except Exception as e:
+            logger.error(f"Error during prediction: {str(e)}")
+            raise
+    
+    def compile_fast_path(self) -> Optional[Dict[str, Any]]:
+        """Extract encoders and estimators from the fitted pipelines for pandas-free inference"""
+        try:
+            fast_path = {}
+            for key in ('rf', 'gb'):
+                ttr = self.model[key]
+                pipeline = ttr.regressor_
+                fast_path[key] = {
+                    'preprocessor': pipeline.named_steps['preprocessor'],
+                    'encoder': CompiledFeatureEncoder(pipeline.named_steps['preprocessor'], self.feature_columns),
+                    'estimator': pipeline.named_steps['est'],
+                    'inverse_func': ttr.inverse_func if ttr.inverse_func is not None else ttr.transformer_.inverse_transform
+                }
+            return fast_path
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.info(f"Fast inference path unavailable for this model: {str(e)}")
+            return None
+    
+    def predict_fast(self, data_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Make prediction for a single car without going through pandas"""
+        if not self.is_trained or not self.fast_path:
+            raise ValueError("Fast inference path is not available")
+        
+        try:
+            if self.compiled is not None:
+                row = self.fast_path['rf']['encoder'].encode(data_dict)
+                rf_pred, gb_pred = self.compiled.predict_components(row)
+                return self.combine_predictions(rf_pred, gb_pred)[0]
             
-            logger.info(f"Prediction: {result['price']:.0f} MAD (confidence: {result['confidence']:.2f})")
+            components = []
+            for key in ('rf', 'gb'):
+                path = self.fast_path[key]
+                row = path['encoder'].encode(data_dict)
+                pred = path['estimator'].predict(row)
+                components.append(np.asarray(path['inverse_func'](pred.reshape(-1, 1)), dtype=float).ravel())
             
-            return result
+            return self.combine_predictions(components[0], components[1])[0]
             
         except Exception as e:
             logger.error(f"Error during prediction: {str(e)}")
             raise
     
+    def compile_ensemble(self) -> Optional[CompiledEnsemble]:
+        """Flatten the fitted RF and GB trees into NumPy arrays"""
+        if not self.fast_path:
+            return None
+        try:
+            # Both members must read the same feature layout
+            if self.fast_path['rf']['encoder'].steps != self.fast_path['gb']['encoder'].steps:
+                raise ValueError("RF and GB preprocessors differ")
+            return CompiledEnsemble.from_model(self.model)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Compiled inference unavailable, using sklearn: {str(e)}")
+            return None
+    
+    def load_compiled(self) -> Optional[CompiledEnsemble]:
+        """Use the exported flat ensemble when it is newer than the model artifact, else compile it"""
+        if not self.fast_path:
+            return None
+        if (os.path.exists(self.compiled_model_path) and
+                os.path.getmtime(self.compiled_model_path) >= os.path.getmtime(self.model_path)):
+            try:
+                compiled = CompiledEnsemble.load(self.compiled_model_path)
+                logger.info(f"Compiled ensemble loaded from {self.compiled_model_path}")
+                return compiled
+            except Exception as e:
+                logger.warning(f"Failed to load compiled ensemble: {str(e)}")
+        return self.compile_ensemble()
+    
+    def export_compiled(self, path: Optional[str] = None) -> str:
+        """Save the flat ensemble so workers can skip compiling it at load time"""
+        path = path or self.compiled_model_path
+        compiled = self.compiled or CompiledEnsemble.from_model(self.model)
+        compiled.save(path)
+        logger.info(f"Compiled ensemble saved to {path}")
+        return path
+    
+    def combine_predictions(self, rf_pred: np.ndarray, gb_pred: np.ndarray) -> List[Dict[str, Any]]:
+        """Blend the component predictions into price and confidence per car"""
+        ensemble_pred = (self.model['weights'][0] * rf_pred + 
+                         self.model['weights'][1] * gb_pred)
+        
+        # Calculate confidence based on individual model agreement
+        pred_diff = np.abs(rf_pred - gb_pred)
+        max_diff = np.maximum(rf_pred, gb_pred) * 0.3  # 30% difference threshold
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(max_diff > 0, np.maximum(0.5, 1 - pred_diff / max_diff), 0.9)
+        
+        prices = np.maximum(10000, ensemble_pred)  # Minimum reasonable price
+        confidence = np.minimum(0.95, confidence)  # Cap confidence at 95%
+        
+        return [
+            {
+                'price': float(price),
+                'confidence': float(conf),
+                'rf_prediction': float(rf),
+                'gb_prediction': float(gb)
+            }
+            for price, conf, rf, gb in zip(prices, confidence, rf_pred, gb_pred)
+        ]
+    
     def save_model(self):
         """Save the trained model and encoders"""
         if self.model and self.is_trained:
@@ -239,6 +370,12 @@ class MLModel:
                 self.preprocessor = model_data.get('preprocessor')
                 self.feature_columns = model_data['feature_columns']
                 self.is_trained = model_data['is_trained']
+                self.fast_path = self.compile_fast_path()
+                self.compiled = self.load_compiled() if self.inference_engine == 'compiled' else None
+                
+                # Predictions from a previous artifact are no longer valid
+                if self.prediction_cache is not None:
+                    self.prediction_cache.clear()
                 
                 logger.info(f"Model loaded from {self.model_path}")
                 return True
@@ -0,0 +1,71 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from models.feature_encoder import to_number
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of single-car predictions, keyed on the model input fields"""
+
+    KEY_FIELDS = ('Brand', 'Model', 'Year', 'KM_Driven', 'Fuel', 'Transmission', 'Seller_Type', 'Owner')
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600, km_bucket: int = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.km_bucket = km_bucket
+        self.hits = 0
+        self.misses = 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def normalize(self, data: Dict[str, Any]) -> Tuple[tuple, Dict[str, Any]]:
+        """Return the cache key and the input to predict on, with mileage bucketed if enabled"""
+        if self.km_bucket > 0:
+            km = to_number(data.get('KM_Driven'))
+            if km == km:  # not NaN
+                data = dict(data, KM_Driven=int(round(km / self.km_bucket)) * self.km_bucket)
+
+        key = []
+        for field in self.KEY_FIELDS:
+            value = data.get(field)
+            if field in ('Year', 'KM_Driven'):
+                # 2018, 2018.0 and "2018" all predict the same
+                number = to_number(value)
+                value = number if number == number else value
+            key.append(value)
+
+        return tuple(key), data
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(result)
+
+    def set(self, key: tuple, result: Dict[str, Any]):
+        with self._lock:
+            self._cache[key] = dict(result)
+
+    def clear(self):
+        """Drop every cached prediction, e.g. when a new model artifact is loaded"""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._cache.expire()
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._cache),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'km_bucket': self.km_bucket
+            }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Precomputed depreciation grid: predicted price per brand/model over year x mileage x fuel x transmission
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+GRID_PATH = "models/price_grid.npz"
+KM_BUCKETS = list(range(0, 300001, 20000))
+FIRST_YEAR = 2005
+
+# Curves are computed for the PredictionRequest defaults
+SELLER_TYPE = "Individual"
+OWNER = "First Owner"
+
+
+def interpolate(values: np.ndarray, grid: np.ndarray, x: float) -> np.ndarray:
+    """Linear interpolation along the last axis of values, sampled at the sorted grid points"""
+    i = int(np.clip(np.searchsorted(grid, x, side='right') - 1, 0, len(grid) - 2))
+    w = (x - grid[i]) / (grid[i + 1] - grid[i])
+    return values[..., i] * (1 - w) + values[..., i + 1] * w
+
+
+class PriceGrid:
+    """Dense price array indexed by (brand/model, fuel, transmission, year, km bucket)"""
+
+    def __init__(self, pairs: List[Tuple[str, str]], fuels: List[str], transmissions: List[str],
+                 years: np.ndarray, kms: np.ndarray, prices: np.ndarray, built_year: int):
+        self.pairs = {pair: i for i, pair in enumerate(pairs)}
+        self.fuels = {fuel: i for i, fuel in enumerate(fuels)}
+        self.transmissions = {transmission: i for i, transmission in enumerate(transmissions)}
+        self.years = np.asarray(years, dtype=np.float64)
+        self.kms = np.asarray(kms, dtype=np.float64)
+        self.prices = prices
+        self.built_year = int(built_year)
+
+    def is_current(self) -> bool:
+        """Car_Age depends on the current year, so a grid built in another year is stale"""
+        return self.built_year == datetime.now().year
+
+    def _slice(self, brand: str, model: str, fuel: str, transmission: str) -> Optional[np.ndarray]:
+        pair = self.pairs.get((brand, model))
+        f = self.fuels.get(fuel)
+        t = self.transmissions.get(transmission)
+        if pair is None or f is None or t is None:
+            return None
+        return self.prices[pair, f, t]
+
+    def year_curve(self, brand: str, model: str, fuel: str, transmission: str, km: float) -> Optional[List[Dict]]:
+        """Price for every grid year at a fixed mileage, or None when off-grid"""
+        prices = self._slice(brand, model, fuel, transmission)
+        if prices is None or not self.kms[0] <= km <= self.kms[-1]:
+            return None
+        curve = interpolate(prices, self.kms, km)
+        return [{"year": int(year), "price": float(price)} for year, price in zip(self.years, curve)]
+
+    def km_curve(self, brand: str, model: str, fuel: str, transmission: str, year: float) -> Optional[List[Dict]]:
+        """Price for every km bucket at a fixed year, or None when off-grid"""
+        prices = self._slice(brand, model, fuel, transmission)
+        if prices is None or not self.years[0] <= year <= self.years[-1]:
+            return None
+        curve = interpolate(np.moveaxis(prices, 0, -1), self.years, year)
+        return [{"km_driven": int(km), "price": float(price)} for km, price in zip(self.kms, curve)]
+
+    def save(self, path: str = GRID_PATH):
+        brands, models = zip(*sorted(self.pairs, key=self.pairs.get)) if self.pairs else ((), ())
+        np.savez_compressed(
+            path,
+            brands=np.array(brands, dtype=str),
+            models=np.array(models, dtype=str),
+            fuels=np.array(sorted(self.fuels, key=self.fuels.get), dtype=str),
+            transmissions=np.array(sorted(self.transmissions, key=self.transmissions.get), dtype=str),
+            years=self.years,
+            kms=self.kms,
+            prices=self.prices,
+            built_year=np.array(self.built_year),
+        )
+
+    @classmethod
+    def load(cls, path: str = GRID_PATH) -> 'PriceGrid':
+        with np.load(path) as arrays:
+            return cls(
+                pairs=list(zip(arrays['brands'].tolist(), arrays['models'].tolist())),
+                fuels=arrays['fuels'].tolist(),
+                transmissions=arrays['transmissions'].tolist(),
+                years=arrays['years'],
+                kms=arrays['kms'],
+                prices=arrays['prices'],
+                built_year=int(arrays['built_year']),
+            )
+
+
+def load_fresh_grid(model_path: str, path: str = GRID_PATH) -> Optional[PriceGrid]:
+    """Load the grid unless it is missing, older than the model artifact, or from another year"""
+    if not os.path.exists(path) or not os.path.exists(model_path):
+        return None
+    if os.path.getmtime(path) < os.path.getmtime(model_path):
+        return None
+    grid = PriceGrid.load(path)
+    return grid if grid.is_current() else None
+
+
+def catalog_pairs(cars_json: str = "data/json/morocco_cars_clean.json",
+                  new_cars_csv: str = "data/csv/morocco_new_cars.csv") -> List[Tuple[str, str]]:
+    """Every brand/model pair listed in the catalog sources"""
+    pairs = []
+
+    if os.path.exists(cars_json):
+        with open(cars_json, "r", encoding="utf-8") as f:
+            cars_data = json.load(f)
+        for brand_name, brand_models in cars_data.get("models", {}).items():
+            pairs.extend((brand_name, model_name) for model_name in brand_models)
+
+    if os.path.exists(new_cars_csv):
+        new_cars = pd.read_csv(new_cars_csv)
+        pairs.extend(new_cars[['Brand', 'Model']].drop_duplicates().itertuples(index=False, name=None))
+
+    return list(dict.fromkeys(pairs))
+
+
+def build_price_grid(ml_model, pairs: List[Tuple[str, str]], fuels: List[str], transmissions: List[str],
+                     years: List[int], kms: List[int]) -> PriceGrid:
+    """Evaluate the model over the full grid, one vectorized batch per brand/model"""
+    prices = np.zeros((len(pairs), len(fuels), len(transmissions), len(years), len(kms)), dtype=np.float32)
+
+    # Same combination order as the reshape below: fuel, transmission, year, km
+    combos = pd.MultiIndex.from_product([fuels, transmissions, years, kms]).to_frame(index=False)
+    combos.columns = ['Fuel', 'Transmission', 'Year', 'KM_Driven']
+    combos['Seller_Type'] = SELLER_TYPE
+    combos['Owner'] = OWNER
+
+    for i, (brand, model) in enumerate(pairs):
+        batch = combos.assign(Brand=brand, Model=model)
+        results = ml_model.predict_many(batch)
+        prices[i] = np.array([r['price'] for r in results]).reshape(prices.shape[1:])
+
+    return PriceGrid(pairs, fuels, transmissions, np.array(years), np.array(kms), prices, datetime.now().year)
+
+
+def main():
+    """Build the price grid for every catalog brand/model and save it"""
+    from models.ml_model import MLModel
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "models/car_price_model.joblib"
+    grid_path = sys.argv[2] if len(sys.argv) > 2 else GRID_PATH
+
+    model = MLModel(model_path=model_path, inference_engine="compiled")
+    if not model.is_loaded():
+        print(f"❌ No trained model at {model_path}")
+        return 1
+
+    pairs = catalog_pairs()
+    new_cars = pd.read_csv("data/csv/morocco_new_cars.csv")
+
+    # Prefer the categories the model was trained on
+    encoder = model.fast_path['rf']['encoder'] if model.fast_path else None
+    fuels = (encoder and encoder.categories('Fuel')) or sorted(new_cars['Fuel'].unique().tolist())
+    transmissions = (encoder and encoder.categories('Transmission')) or sorted(new_cars['Transmission'].unique().tolist())
+    years = list(range(FIRST_YEAR, datetime.now().year + 1))
+
+    print("📈 PRICE GRID BUILDER")
+    print(f"   🚗 {len(pairs)} brand/models x {len(fuels)} fuels x {len(transmissions)} transmissions "
+          f"x {len(years)} years x {len(KM_BUCKETS)} km buckets")
+
+    start = time.time()
+    grid = build_price_grid(model, pairs, fuels, transmissions, years, KM_BUCKETS)
+    grid.save(grid_path)
+
+    print(f"💾 Grid saved to {grid_path} ({grid.prices.size} prices in {time.time() - start:.0f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
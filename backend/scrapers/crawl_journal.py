@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Append-only checkpoint journal for the Kifal crawl, replayed to resume an interrupted crawl
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class CrawlJournal:
+    """One JSON record per line: the brand list, each scraped brand's models, then "saved"
+
+    Records are fsynced as they are written, so a crawl killed at any point loses at most
+    the brands still in flight. A torn last line is dropped on replay.
+    """
+
+    def __init__(self, path: str = "data/cache/kifal_crawl_journal.jsonl"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.brands: Optional[List[Dict[str, Any]]] = None
+        self.brand_models: Dict[str, List[Dict[str, Any]]] = {}
+        self.saved = False
+        self._replay()
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                self._apply(record)
+
+        if valid_bytes < self.path.stat().st_size:
+            # Drop the partial record so new ones start on a fresh line
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _apply(self, record: Dict[str, Any]):
+        if record["type"] == "brands":
+            self.brands = record["brands"]
+            self.brand_models = {}
+            self.saved = False
+        elif record["type"] == "brand":
+            self.brand_models[record["name"]] = record["models"]
+        elif record["type"] == "saved":
+            self.saved = True
+
+    def _append(self, record: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    @property
+    def resumable(self) -> bool:
+        """True when an unsaved crawl has already recorded its brand list"""
+        return self.brands is not None and not self.saved
+
+    def reset(self):
+        """Start a new crawl"""
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.brands = None
+        self.brand_models = {}
+        self.saved = False
+
+    def record_brands(self, brands: List[Dict[str, Any]]):
+        self._append({"type": "brands", "brands": brands})
+
+    def record_brand(self, name: str, models: List[Dict[str, Any]]):
+        self._append({"type": "brand", "name": name, "models": models})
+
+    def mark_saved(self):
+        """The crawl's output was written, so the next crawl starts from scratch"""
+        self._append({"type": "saved"})
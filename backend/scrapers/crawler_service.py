@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Warm pool of Scrapy worker processes, fed crawl requests and streaming items back through queues
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(project_dir: str, requests: multiprocessing.Queue, results: multiprocessing.Queue):
+    """Run one Twisted reactor for the life of the worker and start every requested crawl on it"""
+    try:
+        # Inside the try, so a missing project answers crawls with the error instead of killing the worker
+        os.chdir(project_dir)
+
+        from itemadapter import ItemAdapter
+        from scrapy import signals
+        from scrapy.crawler import CrawlerRunner
+        from scrapy.utils.defer import deferred_from_coro
+        from scrapy.utils.project import get_project_settings
+        from scrapy.utils.reactor import install_reactor
+
+        settings = get_project_settings()
+        if settings.get("TWISTED_REACTOR"):
+            install_reactor(settings["TWISTED_REACTOR"])
+        from twisted.internet import reactor
+
+        runner = CrawlerRunner(settings)
+    except Exception as e:
+        # Answer every crawl with the startup error rather than leaving callers waiting
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            crawl_id, spider_name, _ = request
+            if spider_name is not None:
+                results.put((crawl_id, "error", f"Crawler worker unavailable: {e}"))
+                results.put((crawl_id, "done", None))
+
+    crawlers = {}
+
+    def start_crawl(crawl_id: int, spider_name: str, spider_kwargs: Dict[str, Any]):
+        try:
+            crawler = runner.create_crawler(spider_name)
+        except Exception as e:
+            results.put((crawl_id, "error", str(e)))
+            results.put((crawl_id, "done", None))
+            return
+
+        def item_scraped(item, response, spider):
+            results.put((crawl_id, "item", ItemAdapter(item).asdict()))
+
+        # Signal receivers are weak references by default, and this closure has no other owner
+        crawler.signals.connect(item_scraped, signal=signals.item_scraped, weak=False)
+        crawlers[crawl_id] = crawler
+
+        def finished(outcome):
+            crawlers.pop(crawl_id, None)
+            if hasattr(outcome, "getErrorMessage"):
+                results.put((crawl_id, "error", outcome.getErrorMessage()))
+            results.put((crawl_id, "done", None))
+
+        runner.crawl(crawler, **spider_kwargs).addBoth(finished)
+
+    def stop_crawl(crawl_id: int):
+        crawler = crawlers.get(crawl_id)
+        if crawler is None:
+            return
+        # Scrapy 2.13 replaced Crawler.stop() with a coroutine
+        if hasattr(crawler, "stop_async"):
+            deferred_from_coro(crawler.stop_async())
+        else:
+            crawler.stop()
+
+    def read_requests():
+        while True:
+            request = requests.get()
+            if request is None:
+                reactor.callFromThread(reactor.stop)
+                return
+            crawl_id, spider_name, spider_kwargs = request
+            if spider_name is None:
+                reactor.callFromThread(stop_crawl, crawl_id)
+            else:
+                reactor.callFromThread(start_crawl, crawl_id, spider_name, spider_kwargs)
+
+    threading.Thread(target=read_requests, daemon=True).start()
+    reactor.run(installSignalHandlers=False)
+
+
+class CrawlerService:
+    """Long-lived Scrapy workers that run concurrent crawls without per-request process spawns or temp files"""
+
+    LIVENESS_INTERVAL = 1.0  # seconds
+
+    def __init__(self, project_dir: str, workers: int = 1):
+        self.project_dir = project_dir
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._requests = [self._context.Queue() for _ in range(workers)]
+        self._results = self._context.Queue()
+        self._active = [0] * workers
+        self._ids = itertools.count()
+        # crawl id -> (event loop, asyncio queue) of the caller awaiting its items
+        self._listeners: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def start(self):
+        """Spawn any worker that is not running, plus the result dispatcher thread"""
+        with self._lock:
+            for i, process in enumerate(self._processes):
+                if process is None or not process.is_alive():
+                    process = self._context.Process(
+                        target=_worker_main,
+                        args=(self.project_dir, self._requests[i], self._results),
+                        daemon=True
+                    )
+                    process.start()
+                    self._processes[i] = process
+                    self._active[i] = 0
+                    logger.info(f"Started crawler worker {i} (pid {process.pid})")
+
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+
+    def stop(self):
+        with self._lock:
+            for i, process in enumerate(self._processes):
+                if process is not None and process.is_alive():
+                    self._requests[i].put(None)
+                    process.join(timeout=5)
+                    if process.is_alive():
+                        process.terminate()
+                self._processes[i] = None
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            self._results.put(None)
+            dispatcher.join(timeout=5)
+
+    def _dispatch(self):
+        """Route worker results to the event loop of the crawl they belong to"""
+        while True:
+            message = self._results.get()
+            if message is None:
+                return
+            crawl_id = message[0]
+            with self._lock:
+                listener = self._listeners.get(crawl_id)
+            if listener is not None:
+                loop, items = listener
+                loop.call_soon_threadsafe(items.put_nowait, message[1:])
+
+    async def crawl(self, spider_name: str, spider_kwargs: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Yield a spider's items as they are scraped; the crawl is stopped after `timeout` seconds"""
+        self.start()
+
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        crawl_id = next(self._ids)
+
+        with self._lock:
+            self._listeners[crawl_id] = (loop, items)
+            worker = min(range(self.workers), key=self._active.__getitem__)
+            self._active[worker] += 1
+        self._requests[worker].put((crawl_id, spider_name, spider_kwargs or {}))
+
+        deadline = None if timeout is None else loop.time() + timeout
+        done = False
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"Spider {spider_name} timed out after {timeout}s")
+                    break
+                try:
+                    # Wake up regularly to notice a worker that died mid-crawl
+                    poll = self.LIVENESS_INTERVAL if remaining is None else min(remaining, self.LIVENESS_INTERVAL)
+                    kind, payload = await asyncio.wait_for(items.get(), poll)
+                except asyncio.TimeoutError:
+                    # stop() clears the slot, which is as good as dead for this crawl
+                    process = self._processes[worker]
+                    if process is None or not process.is_alive():
+                        raise RuntimeError(f"Crawler worker {worker} exited during {spider_name} crawl")
+                    continue
+                if kind == "item":
+                    yield payload
+                elif kind == "error":
+                    raise RuntimeError(payload)
+                else:
+                    done = True
+                    break
+        finally:
+            if not done:
+                self._requests[worker].put((crawl_id, None, None))
+            with self._lock:
+                self._listeners.pop(crawl_id, None)
+                self._active[worker] = max(0, self._active[worker] - 1)
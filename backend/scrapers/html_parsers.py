@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTML backends for the Kifal extractors: the BeautifulSoup reference and a C-backed lxml one
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# Tags whose contents BeautifulSoup's get_text() leaves out
+SKIPPED_TEXT_TAGS = ('script', 'style', 'template')
+CARD_CLASS_PATTERN = re.compile(r'card|item|listing|car')
+
+
+class ElementData:
+    """The parts of an HTML element the extractors read"""
+
+    __slots__ = ('text', 'href', 'image', 'link')
+
+    def __init__(self, text: str, href: Optional[str] = None, image: Optional[str] = None,
+                 link: Optional[str] = None):
+        self.text = text
+        self.href = href    # the element's own href
+        self.image = image  # src of its first <img>, if non-empty
+        self.link = link    # href of its first <a href>, if any
+
+
+class SoupDocument:
+    """Reference backend: BeautifulSoup with the pure-Python html.parser"""
+
+    name = 'html.parser'
+
+    def __init__(self, html: str):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    def text(self) -> str:
+        return self.soup.get_text()
+
+    def brand_links(self) -> List[Tuple[str, Optional[str]]]:
+        """(href, first img src) of every /search?marque= link"""
+        links = []
+        for link in self.soup.find_all('a', href=True):
+            href = link.get('href', '')
+            if '/search' in href and 'marque=' in href:
+                img = link.find('img')
+                links.append((href, img.get('src') if img and img.get('src') else None))
+        return links
+
+    def brand_select_options(self) -> List[str]:
+        """Option labels of every <select> that mentions a brand"""
+        options = []
+        for select in self.soup.find_all('select'):
+            if 'marque' in str(select).lower() or 'brand' in str(select).lower():
+                options.extend(option.get_text(strip=True) for option in select.find_all('option'))
+        return options
+
+    def model_elements(self) -> List[ElementData]:
+        """Every <a>/<div> carrying an href, or every <a>/<div> when none does"""
+        elements = self.soup.find_all(['a', 'div'], href=True) or self.soup.find_all(['a', 'div'])
+        data = []
+        for element in elements:
+            img = element.find('img')
+            data.append(ElementData(
+                text=element.get_text(strip=True),
+                href=element.get('href'),
+                image=img.get('src') if img and img.get('src') else None
+            ))
+        return data
+
+    def cards(self) -> List[ElementData]:
+        """Every <div>/<article> whose class looks like a car card"""
+        data = []
+        for card in self.soup.find_all(['div', 'article'], class_=CARD_CLASS_PATTERN):
+            link = card.find('a', href=True)
+            img = card.find('img')
+            data.append(ElementData(
+                text=card.get_text(separator=' ', strip=True),
+                image=img.get('src') if img and img.get('src') else None,
+                link=link.get('href') if link else None
+            ))
+        return data
+
+
+class LxmlDocument:
+    """Fast backend: libxml2 parsing through lxml, with compiled XPath queries"""
+
+    name = 'lxml'
+
+    TEXT_NODES = etree.XPath('.//text()[not(' + ' or '.join(f'parent::{tag}' for tag in SKIPPED_TEXT_TAGS) + ')]')
+    BRAND_LINKS = etree.XPath("//a[@href][contains(@href, '/search') and contains(@href, 'marque=')]")
+    SELECTS = etree.XPath('//select')
+    OPTIONS = etree.XPath('.//option')
+    HREF_ELEMENTS = etree.XPath('//a[@href] | //div[@href]')
+    ALL_ELEMENTS = etree.XPath('//a | //div')
+    CLASSED_ELEMENTS = etree.XPath('//div[@class] | //article[@class]')
+    FIRST_IMG = etree.XPath('(.//img)[1]')
+    FIRST_LINK = etree.XPath('(.//a[@href])[1]')
+
+    def __init__(self, html: str):
+        try:
+            self.root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # Unicode input with an XML encoding declaration must be parsed as bytes
+            self.root = lxml.html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError:
+            # Empty document
+            self.root = lxml.html.document_fromstring('<html></html>')
+
+    def _text(self, element, separator: str = '', strip: bool = False) -> str:
+        strings = self.TEXT_NODES(element)
+        if strip:
+            return separator.join(s for s in (s.strip() for s in strings) if s)
+        return separator.join(strings)
+
+    def _image(self, element) -> Optional[str]:
+        img = self.FIRST_IMG(element)
+        return (img[0].get('src') or None) if img else None
+
+    def text(self) -> str:
+        return self._text(self.root)
+
+    def brand_links(self) -> List[Tuple[str, Optional[str]]]:
+        return [(link.get('href'), self._image(link)) for link in self.BRAND_LINKS(self.root)]
+
+    def brand_select_options(self) -> List[str]:
+        options = []
+        for select in self.SELECTS(self.root):
+            markup = etree.tostring(select, encoding='unicode', with_tail=False).lower()
+            if 'marque' in markup or 'brand' in markup:
+                options.extend(self._text(option, strip=True) for option in self.OPTIONS(select))
+        return options
+
+    def model_elements(self) -> List[ElementData]:
+        elements = self.HREF_ELEMENTS(self.root) or self.ALL_ELEMENTS(self.root)
+        return [
+            ElementData(text=self._text(element, strip=True), href=element.get('href'), image=self._image(element))
+            for element in elements
+        ]
+
+    def cards(self) -> List[ElementData]:
+        data = []
+        for card in self.CLASSED_ELEMENTS(self.root):
+            if not CARD_CLASS_PATTERN.search(card.get('class')):
+                continue
+            link = self.FIRST_LINK(card)
+            data.append(ElementData(
+                text=self._text(card, separator=' ', strip=True),
+                image=self._image(card),
+                link=link[0].get('href') if link else None
+            ))
+        return data
+
+
+PARSER_BACKENDS: Dict[str, type] = {
+    SoupDocument.name: SoupDocument,
+    LxmlDocument.name: LxmlDocument,
+}
+
+
+def get_parser_backend(name: str) -> type:
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}', expected one of {sorted(PARSER_BACKENDS)}")
+    return PARSER_BACKENDS[name]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Disk-backed HTTP response cache for incremental crawls: content-addressed bodies plus a JSON index
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class HttpCache:
+    """URL -> validators and body hash, with bodies stored once per distinct content
+
+    Values derived from a body (parse results, extracted models...) can be memoized against its
+    hash, so unchanged pages need neither re-downloading nor re-parsing on the next crawl.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: str = "data/cache/kifal_http"):
+        self.directory = Path(directory)
+        self.bodies_dir = self.directory / "bodies"
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / self.INDEX_FILE
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.derived: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.entries = index.get("entries", {})
+            self.derived = index.get("derived", {})
+
+    @staticmethod
+    def content_hash(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a URL fetched by an earlier crawl"""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry and self.has_body(entry["sha256"]):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def has_body(self, sha256: str) -> bool:
+        return (self.bodies_dir / f"{sha256}.html").exists()
+
+    def cached_hash(self, url: str) -> Optional[str]:
+        entry = self.entries.get(url)
+        return entry["sha256"] if entry else None
+
+    def load_body(self, sha256: str) -> str:
+        with open(self.bodies_dir / f"{sha256}.html", "r", encoding="utf-8") as f:
+            return f.read()
+
+    def store(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """Record a 200 response and return its content hash"""
+        sha256 = self.content_hash(body)
+        body_path = self.bodies_dir / f"{sha256}.html"
+        if not body_path.exists():
+            tmp_path = body_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+
+        self.entries[url] = {
+            "sha256": sha256,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        return sha256
+
+    def touch(self, url: str):
+        """Record that a 304 revalidated the cached entry"""
+        self.entries[url]["fetched_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def get_derived(self, sha256: str, name: str) -> Any:
+        return self.derived.get(sha256, {}).get(name)
+
+    def set_derived(self, sha256: str, name: str, value: Any):
+        self.derived.setdefault(sha256, {})[name] = value
+
+    def save(self):
+        """Write the index atomically and drop bodies and derived values no URL points to anymore"""
+        live = {entry["sha256"] for entry in self.entries.values()}
+        self.derived = {sha256: values for sha256, values in self.derived.items() if sha256 in live}
+
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries, "derived": self.derived}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+        for body_path in self.bodies_dir.glob("*.html"):
+            if body_path.stem not in live:
+                body_path.unlink()
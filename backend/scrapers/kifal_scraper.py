@@ -2,29 +2,72 @@
 """
 🚗 KIFAL.MA COMPREHENSIVE DATA SCRAPER
 Extract real, accurate car data directly from neuf.kifal.ma
+
+Run from backend/: python -m scrapers.kifal_scraper
 """
 
 import asyncio
 import aiohttp
 import json
+import os
 import re
 import time
-from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
 from urllib.parse import urljoin, urlparse
 import logging
 from pathlib import Path
 
+from scrapers.crawl_journal import CrawlJournal
+from scrapers.html_parsers import ElementData, get_parser_backend
+from scrapers.http_cache import HttpCache
+from scrapers.listing_text import extract_listing_details
+from scrapers.rate_limiter import HostRateLimiter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class FetchedPage:
+    """Raw HTML of a downloaded page and its content hash; parsing is left to the scraper"""
+    
+    def __init__(self, url: str, text: str, sha256: str):
+        self.url = url
+        self.text = text
+        self.sha256 = sha256
+
 class KifalDataScraper:
     """Comprehensive scraper for Kifal.ma car data"""
     
-    def __init__(self):
-        self.base_url = "https://neuf.kifal.ma"
+    # Bump when extraction logic changes, so values derived from cached pages are recomputed
+    DERIVED_VERSION = 3
+    
+    def __init__(self, concurrency: int = 5, requests_per_second: float = 5.0, burst: int = 5,
+                 http_cache_dir: Optional[str] = "data/cache/kifal_http", parser: str = "lxml",
+                 journal_path: Optional[str] = "data/cache/kifal_crawl_journal.jsonl",
+                 base_url: str = "https://neuf.kifal.ma"):
+        self.base_url = base_url.rstrip("/")
+        # HTML backend from scrapers.html_parsers: "lxml" (fast) or "html.parser" (BeautifulSoup reference)
+        self.parser = parser
+        self.document_class = get_parser_backend(parser)
         self.session = None
+        # At most `concurrency` requests in flight, paced per host by a token bucket
+        self.concurrency = concurrency
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.request_slots = None
+        self.pages_fetched = 0
+        self.crawl_started = None
+        # URL -> task resolving to the downloaded page, so each URL is downloaded once per crawl
+        self.page_cache: Dict[str, asyncio.Task] = {}
+        self.page_cache_hits = 0
+        # Content hash -> parsed document, so identical bodies are parsed once per crawl
+        self.parsed_pages: Dict[str, Any] = {}
+        # Persistent cache for conditional requests across crawls; None disables it
+        self.http_cache = HttpCache(http_cache_dir) if http_cache_dir else None
+        self.pages_not_modified = 0
+        self.pages_unchanged = 0
+        # Checkpoints per-brand results so an interrupted crawl resumes; None disables it
+        self.journal_path = journal_path
+        self.journal: Optional[CrawlJournal] = None
         self.scraped_data = {
             "brands": {},
             "models": {},
@@ -48,30 +91,113 @@ class KifalDataScraper:
     
     async def create_session(self):
         """Create async HTTP session"""
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+        connector = aiohttp.TCPConnector(limit=10, limit_per_host=self.concurrency)
         timeout = aiohttp.ClientTimeout(total=30)
         self.session = aiohttp.ClientSession(
             headers=self.headers,
             connector=connector,
             timeout=timeout
         )
+        self.request_slots = asyncio.Semaphore(self.concurrency)
+        self.pages_fetched = 0
+        self.crawl_started = time.monotonic()
+        self.page_cache = {}
+        self.page_cache_hits = 0
+        self.parsed_pages = {}
+        self.pages_not_modified = 0
+        self.pages_unchanged = 0
     
     async def close_session(self):
         """Close HTTP session"""
         if self.session:
             await self.session.close()
+        if self.http_cache:
+            self.http_cache.save()
+    
+    def throughput(self) -> Dict[str, float]:
+        """Pages fetched since the session was created, and the rate in pages/sec"""
+        elapsed = time.monotonic() - self.crawl_started if self.crawl_started else 0.0
+        return {
+            "pages": self.pages_fetched,
+            "cache_hits": self.page_cache_hits,
+            "not_modified": self.pages_not_modified,
+            "unchanged": self.pages_unchanged,
+            "parsed": len(self.parsed_pages),
+            "seconds": round(elapsed, 2),
+            "pages_per_sec": round(self.pages_fetched / elapsed, 2) if elapsed > 0 else 0.0
+        }
+    
+    async def fetch_page(self, url: str, retries: int = 3):
+        """Fetch and parse a web page, reusing the parsed page if this crawl already requested it"""
+        page = await self.fetch_raw_page(url, retries)
+        return self.parse_page(page) if page else None
+    
+    async def fetch_raw_page(self, url: str, retries: int = 3) -> Optional[FetchedPage]:
+        """Fetch a web page without parsing it, at most once per crawl"""
+        page = self.page_cache.get(url)
+        if page is None:
+            # Concurrent callers for the same URL share the in-flight download
+            page = self.page_cache[url] = asyncio.ensure_future(self.download_page(url, retries))
+        else:
+            self.page_cache_hits += 1
+        return await page
     
-    async def fetch_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
-        """Fetch and parse a web page"""
+    def parse_page(self, page: FetchedPage):
+        """Parse a page with the configured backend, once per distinct body"""
+        document = self.parsed_pages.get(page.sha256)
+        if document is None:
+            document = self.parsed_pages[page.sha256] = self.document_class(page.text)
+        return document
+    
+    def derive(self, page: FetchedPage, name: str, compute):
+        """Value computed from a page, memoized in the HTTP cache against the page's content hash"""
+        if not self.http_cache:
+            return compute()
+        
+        # Backends may disagree on malformed markup, so each keeps its own derived values
+        key = f"{name}@v{self.DERIVED_VERSION}:{self.parser}"
+        value = self.http_cache.get_derived(page.sha256, key)
+        if value is None:
+            value = compute()
+            self.http_cache.set_derived(page.sha256, key, value)
+        return value
+    
+    async def download_page(self, url: str, retries: int = 3) -> Optional[FetchedPage]:
+        """Download a web page, revalidating the persistent cache copy when there is one"""
         for attempt in range(retries):
             try:
-                logger.info(f"Fetching: {url} (attempt {attempt + 1})")
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return BeautifulSoup(content, 'html.parser')
-                    else:
-                        logger.warning(f"HTTP {response.status} for {url}")
+                headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+                
+                await self.rate_limiter.wait(url)
+                async with self.request_slots:
+                    logger.info(f"Fetching: {url} (attempt {attempt + 1})")
+                    async with self.session.get(url, headers=headers) as response:
+                        self.pages_fetched += 1
+                        if response.status == 304 and headers:
+                            content = None
+                            not_modified = True
+                        elif response.status == 200:
+                            content = await response.text()
+                            not_modified = False
+                            validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                        else:
+                            logger.warning(f"HTTP {response.status} for {url}")
+                            continue
+                
+                if not_modified:
+                    self.pages_not_modified += 1
+                    self.http_cache.touch(url)
+                    sha256 = self.http_cache.cached_hash(url)
+                    return FetchedPage(url, self.http_cache.load_body(sha256), sha256)
+                
+                if not self.http_cache:
+                    return FetchedPage(url, content, HttpCache.content_hash(content))
+                
+                previous = self.http_cache.cached_hash(url)
+                sha256 = self.http_cache.store(url, content, *validators)
+                if sha256 == previous:
+                    self.pages_unchanged += 1
+                return FetchedPage(url, content, sha256)
                         
             except Exception as e:
                 logger.error(f"Error fetching {url}: {e}")
@@ -87,15 +213,19 @@ class KifalDataScraper:
         brands = []
         
         # Method 1: Extract from homepage
-        soup = await self.fetch_page(self.base_url)
-        if soup:
-            brands.extend(self.extract_brands_from_page(soup))
-        
         # Method 2: Try to find brand selector/dropdown
         # Many car sites have a brand selector dropdown
-        search_page = await self.fetch_page(f"{self.base_url}/search")
+        home_page, search_page = await asyncio.gather(
+            self.fetch_raw_page(self.base_url),
+            self.fetch_raw_page(f"{self.base_url}/search")
+        )
+        if home_page:
+            brands.extend(self.derive(home_page, "page_brands",
+                                      lambda: self.extract_brands_from_page(self.parse_page(home_page))))
+        
         if search_page:
-            brands.extend(self.extract_brands_from_search_page(search_page))
+            brands.extend(self.derive(search_page, "search_page_brands",
+                                      lambda: self.extract_brands_from_search_page(self.parse_page(search_page))))
         
         # Method 3: Common brand list - ensure we don't miss major brands
         common_brands = [
@@ -114,12 +244,13 @@ class KifalDataScraper:
             'VOLKSWAGEN', 'VW', 'ZEEKR'
         ]
         
-        # Check each common brand
-        for brand_name in common_brands:
-            brand_url = f"{self.base_url}/search?marque={brand_name}"
-            test_page = await self.fetch_page(brand_url)
-            
-            if test_page and not self.is_empty_results_page(test_page):
+        # Check every common brand concurrently; results come back in list order
+        brand_urls = [f"{self.base_url}/search?marque={brand_name}" for brand_name in common_brands]
+        test_pages = await asyncio.gather(*(self.fetch_raw_page(brand_url) for brand_url in brand_urls))
+        
+        for brand_name, brand_url, test_page in zip(common_brands, brand_urls, test_pages):
+            if test_page and not self.derive(test_page, "empty_results",
+                                             lambda: self.is_empty_results_page(self.parse_page(test_page))):
                 brands.append({
                     'name': brand_name,
                     'url': brand_url,
@@ -139,60 +270,47 @@ class KifalDataScraper:
         
         return brands_list
     
-    def extract_brands_from_page(self, soup) -> List[Dict[str, str]]:
+    def extract_brands_from_page(self, document) -> List[Dict[str, str]]:
         """Extract brands from a page"""
         brands = []
         
-        # Look for brand links and images
-        brand_links = soup.find_all('a', href=True)
-        
-        for link in brand_links:
-            href = link.get('href', '')
-            
-            # Check if it's a brand page URL
-            if '/search' in href and 'marque=' in href:
-                match = re.search(r'marque=([^&]+)', href)
-                if match:
-                    brand_name = match.group(1).replace('%20', ' ').upper()
-                    
-                    img = link.find('img')
-                    brand_image = None
-                    if img and img.get('src'):
-                        brand_image = urljoin(self.base_url, img.get('src'))
-                    
-                    brands.append({
-                        'name': brand_name,
-                        'url': urljoin(self.base_url, href),
-                        'image': brand_image,
-                        'category': self.categorize_brand(brand_name)
-                    })
+        # Brand page links (/search?marque=...) and their logos
+        for href, img_src in document.brand_links():
+            match = re.search(r'marque=([^&]+)', href)
+            if match:
+                brand_name = match.group(1).replace('%20', ' ').upper()
+                
+                brand_image = urljoin(self.base_url, img_src) if img_src else None
+                
+                brands.append({
+                    'name': brand_name,
+                    'url': urljoin(self.base_url, href),
+                    'image': brand_image,
+                    'category': self.categorize_brand(brand_name)
+                })
         
         return brands
     
-    def extract_brands_from_search_page(self, soup) -> List[Dict[str, str]]:
+    def extract_brands_from_search_page(self, document) -> List[Dict[str, str]]:
         """Extract brands from search page dropdowns/selectors"""
         brands = []
         
-        # Look for select elements with brand options
-        selects = soup.find_all('select')
-        for select in selects:
-            if 'marque' in str(select).lower() or 'brand' in str(select).lower():
-                options = select.find_all('option')
-                for option in options:
-                    brand_name = option.get_text(strip=True).upper()
-                    if brand_name and len(brand_name) > 1 and brand_name != 'TOUS':
-                        brands.append({
-                            'name': brand_name,
-                            'url': f"{self.base_url}/search?marque={brand_name}",
-                            'image': f"https://referentiel.kifal.ma/imgs/brands/{brand_name}.webp",
-                            'category': self.categorize_brand(brand_name)
-                        })
+        # Options of the select elements with brand options
+        for option_text in document.brand_select_options():
+            brand_name = option_text.upper()
+            if brand_name and len(brand_name) > 1 and brand_name != 'TOUS':
+                brands.append({
+                    'name': brand_name,
+                    'url': f"{self.base_url}/search?marque={brand_name}",
+                    'image': f"https://referentiel.kifal.ma/imgs/brands/{brand_name}.webp",
+                    'category': self.categorize_brand(brand_name)
+                })
         
         return brands
     
-    def is_empty_results_page(self, soup) -> bool:
+    def is_empty_results_page(self, document) -> bool:
         """Check if the page shows empty results"""
-        text = soup.get_text().lower()
+        text = document.text().lower()
         empty_indicators = [
             'aucun résultat', 'no results', '0 result', 'pas de résultats',
             'aucune annonce', 'no listings', 'empty', 'vide'
@@ -241,39 +359,19 @@ class KifalDataScraper:
         else:
             return 'generaliste'
     
-    async def scrape_brand_models(self, brand: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Scrape all models for a specific brand"""
+    async def scrape_brand_models(self, brand: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """Scrape all models for a specific brand, or None if the brand page could not be downloaded"""
         logger.info(f"🚗 Scraping models for {brand['name']}...")
         
-        models = []
-        
         # Try brand page URL
         brand_url = f"{self.base_url}/search?marque={brand['name']}"
-        soup = await self.fetch_page(brand_url)
+        page = await self.fetch_raw_page(brand_url)
         
-        if not soup:
-            return models
-        
-        # Look for model listings
-        model_elements = soup.find_all(['a', 'div'], href=True) or soup.find_all(['a', 'div'])
-        
-        for element in model_elements:
-            model_info = self.extract_model_info(element, brand['name'])
-            if model_info:
-                models.append(model_info)
-        
-        # Also try to find models in search results
-        search_url = f"{self.base_url}/search?marque={brand['name']}"
-        soup = await self.fetch_page(search_url)
+        if not page:
+            return None
         
-        if soup:
-            # Look for car cards/listings
-            car_cards = soup.find_all(['div', 'article'], class_=re.compile(r'card|item|listing|car'))
-            
-            for card in car_cards:
-                model_info = self.extract_model_from_card(card, brand['name'])
-                if model_info:
-                    models.append(model_info)
+        models = self.derive(page, f"models:{brand['name']}",
+                             lambda: self.extract_models_from_page(self.parse_page(page), brand['name']))
         
         # Remove duplicates based on model name
         unique_models = {}
@@ -287,18 +385,37 @@ class KifalDataScraper:
         
         return models_list
     
-    def extract_model_info(self, element, brand_name: str) -> Optional[Dict[str, Any]]:
+    def extract_models_from_page(self, document, brand_name: str) -> List[Dict[str, Any]]:
+        """Extract every model listing and car card from a brand search page"""
+        models = []
+        
+        # Look for model listings
+        for element in document.model_elements():
+            model_info = self.extract_model_info(element, brand_name)
+            if model_info:
+                models.append(model_info)
+        
+        # Also try to find models in search results, which are on the same page
+        # Look for car cards/listings
+        for card in document.cards():
+            model_info = self.extract_model_from_card(card, brand_name)
+            if model_info:
+                models.append(model_info)
+        
+        return models
+    
+    def extract_model_info(self, element: ElementData, brand_name: str) -> Optional[Dict[str, Any]]:
         """Extract model information from HTML element"""
         try:
             # Try to get model name from text
-            text = element.get_text(strip=True) if hasattr(element, 'get_text') else str(element)
+            text = element.text
             
             # Skip if it's just the brand name or too generic
             if not text or text.upper() == brand_name or len(text) < 2:
                 return None
             
             # Try to get URL
-            url = element.get('href') if element.get('href') else None
+            url = element.href if element.href else None
             if url and not url.startswith('http'):
                 url = urljoin(self.base_url, url)
             
@@ -307,10 +424,7 @@ class KifalDataScraper:
             price = self.extract_price(price_text)
             
             # Try to get image
-            img = element.find('img') if hasattr(element, 'find') else None
-            image_url = None
-            if img and img.get('src'):
-                image_url = urljoin(self.base_url, img.get('src'))
+            image_url = urljoin(self.base_url, element.image) if element.image else None
             
             # Extract model name (remove brand name if present)
             model_name = text.replace(brand_name, '').strip()
@@ -330,11 +444,11 @@ class KifalDataScraper:
             logger.debug(f"Error extracting model info: {e}")
             return None
     
-    def extract_model_from_card(self, card_element, brand_name: str) -> Optional[Dict[str, Any]]:
+    def extract_model_from_card(self, card_element: ElementData, brand_name: str) -> Optional[Dict[str, Any]]:
         """Extract model info from car card element"""
         try:
             # Get all text content
-            text_content = card_element.get_text(separator=' ', strip=True)
+            text_content = card_element.text
             
             # Try to extract model name
             model_match = re.search(f'{brand_name}\\s+([^\\d]+)', text_content, re.IGNORECASE)
@@ -347,12 +461,10 @@ class KifalDataScraper:
             price = self.extract_price(text_content)
             
             # Get URL
-            link = card_element.find('a', href=True)
-            url = urljoin(self.base_url, link.get('href')) if link else None
+            url = urljoin(self.base_url, card_element.link) if card_element.link is not None else None
             
             # Get image
-            img = card_element.find('img')
-            image_url = urljoin(self.base_url, img.get('src')) if img and img.get('src') else None
+            image_url = urljoin(self.base_url, card_element.image) if card_element.image else None
             
             return {
                 'brand': brand_name,
@@ -369,92 +481,109 @@ class KifalDataScraper:
     
     def extract_price(self, text: str) -> Optional[int]:
         """Extract price from text"""
-        try:
-            # Look for price patterns
-            price_patterns = [
-                r'(\d{1,3}(?:\s?\d{3})*)\s*(?:DH|MAD|Dh)',  # 123 456 DH
-                r'(\d{1,3}(?:,\d{3})*)\s*(?:DH|MAD|Dh)',    # 123,456 DH
-                r'(\d{3,})\s*(?:DH|MAD|Dh)',                # 123456 DH
-                r'Prix\s*:?\s*(\d{1,3}(?:\s?\d{3})*)',      # Prix: 123 456
-            ]
-            
-            for pattern in price_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    price_str = matches[0].replace(' ', '').replace(',', '')
-                    price = int(price_str)
-                    # Validate price range (50K to 5M MAD)
-                    if 50000 <= price <= 5000000:
-                        return price
-            
-        except (ValueError, AttributeError):
-            pass
-        
-        return None
+        return extract_listing_details(text)['price']
     
     async def scrape_complete_data(self) -> Dict[str, Any]:
-        """Scrape complete car data from Kifal.ma"""
+        """Scrape complete car data from Kifal.ma, resuming an interrupted crawl from its journal"""
         logger.info("🚀 Starting comprehensive Kifal.ma data scraping...")
         
         await self.create_session()
         
         try:
-            # 1. Extract brands
-            brands = await self.extract_brands_from_homepage()
-            self.scraped_data["brands"] = {brand["name"]: brand for brand in brands}
+            if self.journal_path:
+                self.journal = CrawlJournal(self.journal_path)
+                if not self.journal.resumable:
+                    self.journal.reset()
             
-            # 2. Scrape models for each brand
-            all_models = []
+            # 1. Extract brands
+            if self.journal and self.journal.resumable:
+                brands = self.journal.brands
+                brand_models = dict(self.journal.brand_models)
+                logger.info(f"♻️ Resuming crawl: {len(brand_models)} of {len(brands)} brands already scraped")
+            else:
+                brands = await self.extract_brands_from_homepage()
+                brand_models = {}
+                if self.journal:
+                    self.journal.record_brands(brands)
             
-            # Scrape ALL brands - no limits!
-            for brand in brands:
+            # 2. Scrape models for each brand not scraped yet
+            async def scrape_and_record(brand: Dict[str, str]):
                 models = await self.scrape_brand_models(brand)
-                all_models.extend(models)
-                
-                # Add delay to be respectful
-                await asyncio.sleep(2)
+                if models is None:
+                    # Not journaled, so a resumed crawl retries the brand
+                    logger.warning(f"⚠️ Could not download the {brand['name']} brand page, no models recorded")
+                    brand_models[brand['name']] = []
+                    return
+                brand_models[brand['name']] = models
+                if self.journal:
+                    self.journal.record_brand(brand['name'], models)
             
-            # Organize models data
-            self.scraped_data["models"] = {}
-            self.scraped_data["cars"] = {}
-            
-            for model in all_models:
-                brand_name = model["brand"]
-                model_name = model["model"]
-                
-                if brand_name not in self.scraped_data["models"]:
-                    self.scraped_data["models"][brand_name] = {}
-                
-                if model_name not in self.scraped_data["models"][brand_name]:
-                    self.scraped_data["models"][brand_name][model_name] = []
-                
-                self.scraped_data["models"][brand_name][model_name].append(model)
+            # Scrape ALL brands - no limits! Politeness comes from the per-host token bucket
+            await asyncio.gather(*(scrape_and_record(brand) for brand in brands if brand['name'] not in brand_models))
             
-            # Update metadata
-            self.scraped_data["metadata"].update({
-                "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "total_brands": len(self.scraped_data["brands"]),
-                "total_models": len(all_models),
-                "total_cars": sum(len(models) for brand_models in self.scraped_data["models"].values() 
-                                for models in brand_models.values())
-            })
+            self.assemble_data(brands, brand_models, time.strftime("%Y-%m-%d %H:%M:%S"))
             
             logger.info("✅ Scraping completed successfully!")
             logger.info(f"📊 Results: {self.scraped_data['metadata']['total_brands']} brands, "
                        f"{self.scraped_data['metadata']['total_models']} models, "
                        f"{self.scraped_data['metadata']['total_cars']} cars")
             
+            stats = self.throughput()
+            logger.info(f"⚡ Crawled {stats['pages']} pages in {stats['seconds']}s "
+                       f"({stats['pages_per_sec']} pages/sec, {stats['cache_hits']} page cache hits)")
+            
         finally:
             await self.close_session()
         
         return self.scraped_data
     
+    def assemble_data(self, brands: List[Dict[str, str]], brand_models: Dict[str, List[Dict[str, Any]]],
+                      scraped_at: str):
+        """Organize brands and their scraped models into self.scraped_data"""
+        self.scraped_data["brands"] = {brand["name"]: brand for brand in brands}
+        
+        # Organize models data, in brand order
+        all_models = [model for brand in brands for model in brand_models.get(brand["name"], [])]
+        self.scraped_data["models"] = {}
+        self.scraped_data["cars"] = {}
+        
+        for model in all_models:
+            brand_name = model["brand"]
+            model_name = model["model"]
+            
+            if brand_name not in self.scraped_data["models"]:
+                self.scraped_data["models"][brand_name] = {}
+            
+            if model_name not in self.scraped_data["models"][brand_name]:
+                self.scraped_data["models"][brand_name][model_name] = []
+            
+            self.scraped_data["models"][brand_name][model_name].append(model)
+        
+        # Update metadata
+        self.scraped_data["metadata"].update({
+            "scraped_at": scraped_at,
+            "total_brands": len(self.scraped_data["brands"]),
+            "total_models": len(all_models),
+            "total_cars": sum(len(models) for model_groups in self.scraped_data["models"].values() 
+                            for models in model_groups.values())
+        })
+    
     def save_data(self, filename: str = "data/json/kifal_scraped_data.json"):
-        """Save scraped data to JSON file"""
+        """Save scraped data to JSON file, assembled from the crawl journal when there is one"""
+        journal = self.journal or (CrawlJournal(self.journal_path) if self.journal_path else None)
+        if journal and journal.resumable:
+            scraped_at = self.scraped_data["metadata"]["scraped_at"] or time.strftime("%Y-%m-%d %H:%M:%S")
+            self.assemble_data(journal.brands, journal.brand_models, scraped_at)
+        
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
         
-        with open(filename, 'w', encoding='utf-8') as f:
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
             json.dump(self.scraped_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_filename, filename)
+        
+        if journal and journal.resumable:
+            journal.mark_saved()
         
         logger.info(f"💾 Data saved to {filename}")
 
@@ -478,6 +607,7 @@ async def main():
         print(f"   🚗 Models: {data['metadata']['total_models']}")
         print(f"   📋 Cars: {data['metadata']['total_cars']}")
         print(f"   💾 Saved to: data/json/kifal_scraped_data.json")
+        print(f"   ⚡ Throughput: {scraper.throughput()['pages_per_sec']} pages/sec")
         
         return data
         
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction of price, year, engine, fuel and transmission from a listing's scraped text
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+# Valid new car prices (MAD)
+MIN_PRICE = 50000
+MAX_PRICE = 5000000
+
+# Checked in this order when a text mentions several
+FUEL_TYPES = ('ESSENCE', 'DIESEL', 'HYBRID', 'ELECTRIQUE', 'GPL')
+
+# One alternation over every token the extractors care about, scanned once per text.
+# Alternatives are tried in order at each position, so longer forms come first; the leading
+# lookahead rejects positions no alternative can start at before any of them is tried.
+LISTING_TOKENS = re.compile(r'''
+  (?=[\dpedhgacm])
+  (?:
+    (?P<year>(?<!\d)20\d{2}(?!\d))                                                  # 2021, kept out of "2021 250 000 DH"
+  | (?P<prix>prix\s*:?\s*(?P<prix_amount>\d{1,3}(?:\s?\d{3})*))(?:\s*(?:dh|mad))?  # Prix: 123 456
+  | (?P<amount>\d{1,3}(?:\s?\d{3})+|\d{1,3}(?:,\d{3})+|\d+)\s*(?:dh|mad)          # 123 456 DH, 123,456 DH
+  | (?P<engine>(?:\d+\.\d+|\d+)\s*(?:l|tsi|tdi|hdi|dci))                           # 1.6 L, 2.0 TDI
+  | (?P<fuel>essence|diesel|hybrid|electrique|gpl)
+  | (?P<automatic>auto|cvt|dsg)
+  | (?P<manual>manuel|mt)
+  )
+''', re.IGNORECASE | re.VERBOSE)
+
+NON_DIGITS = re.compile(r'\D')
+
+
+def parse_amount(amount: str) -> Optional[int]:
+    """Digits of a matched amount as a price, if it is in the valid range"""
+    price = int(NON_DIGITS.sub('', amount))
+    return price if MIN_PRICE <= price <= MAX_PRICE else None
+
+
+def extract_listing_details(text: str) -> Dict[str, Any]:
+    """Price, year, engine, fuel type and transmission found in a listing text
+
+    Suffixed amounts ("123 456 DH") take precedence over "Prix:" ones; other fields keep
+    their first occurrence. Transmission is AUTOMATIQUE if any automatic term appears.
+    """
+    price = prix_price = year = engine = None
+    fuels = set()
+    automatic = manual = False
+
+    for match in LISTING_TOKENS.finditer(text or ''):
+        kind = match.lastgroup
+        if kind == 'amount':
+            if price is None:
+                price = parse_amount(match.group('amount'))
+        elif kind == 'prix':
+            if prix_price is None:
+                prix_price = parse_amount(match.group('prix_amount'))
+        elif kind == 'engine':
+            if engine is None:
+                engine = match.group().upper()
+        elif kind == 'year':
+            if year is None:
+                year = int(match.group())
+        elif kind == 'fuel':
+            fuels.add(match.group().upper())
+        elif kind == 'automatic':
+            automatic = True
+        else:
+            manual = True
+
+    if automatic:
+        transmission = 'AUTOMATIQUE'
+    elif manual:
+        transmission = 'MANUELLE'
+    else:
+        transmission = None
+
+    return {
+        'price': price if price is not None else prix_price,
+        'year': year,
+        'engine': engine,
+        'fuel_type': next((fuel for fuel in FUEL_TYPES if fuel in fuels), None),
+        'transmission': transmission
+    }
@@ -0,0 +1,128 @@
+"""
+Parity of the MLModel inference paths with the fitted sklearn pipelines
+
+Run from backend/: python -m pytest tests (or python -m unittest discover tests)
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from models.compiled_forest import CompiledEnsemble
+from models.ml_model import MLModel
+
+BRAND_MODELS = {
+    "Dacia": ["Logan", "Sandero", "Duster"],
+    "Renault": ["Clio", "Megane"],
+    "Peugeot": ["208", "308", "3008"],
+    "Toyota": ["Yaris", "Corolla"]
+}
+FUELS = ["Diesel", "Essence", "Hybride"]
+SELLER_TYPES = ["Particulier", "Professionnel"]
+TRANSMISSIONS = ["Manuelle", "Automatique"]
+OWNERS = ["First Owner", "Second Owner", "Third Owner"]
+
+
+def synthetic_listings(n: int = 400, seed: int = 7) -> pd.DataFrame:
+    """Used car listings whose price depends on every feature the model reads"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        brand = rng.choice(list(BRAND_MODELS))
+        model = rng.choice(BRAND_MODELS[brand])
+        year = int(rng.integers(2005, 2024))
+        km = int(rng.integers(5000, 300000))
+        fuel = rng.choice(FUELS)
+        transmission = rng.choice(TRANSMISSIONS)
+        price = (60000 + 4000 * list(BRAND_MODELS).index(brand) + 9000 * (year - 2005) - 0.15 * km
+                 + (15000 if transmission == "Automatique" else 0) + (8000 if fuel == "Hybride" else 0)
+                 + rng.normal(0, 5000))
+        rows.append({
+            "Brand": brand, "Model": model, "Year": year, "KM_Driven": km, "Fuel": fuel,
+            "Seller_Type": rng.choice(SELLER_TYPES), "Transmission": transmission,
+            "Owner": rng.choice(OWNERS), "Selling_Price": max(20000, round(price))
+        })
+    return pd.DataFrame(rows)
+
+
+def prediction_inputs() -> list:
+    """Known cars plus unknown categories, missing columns and unparsable numbers"""
+    cars = synthetic_listings(30, seed=11).drop(columns="Selling_Price").to_dict("records")
+    cars += [
+        {"Brand": "Lada", "Model": "Niva", "Year": 2012, "KM_Driven": 150000, "Fuel": "Electrique",
+         "Seller_Type": "Concessionnaire", "Transmission": "Robotisee", "Owner": "Fourth Owner"},
+        {"Brand": "Dacia", "Model": "Spring", "Year": 2023, "KM_Driven": 0, "Fuel": "Diesel",
+         "Seller_Type": "Particulier", "Transmission": "Manuelle", "Owner": "First Owner"},
+        {"Brand": "Toyota", "Model": "Yaris", "Year": "2018", "KM_Driven": "85000", "Fuel": "Hybride",
+         "Seller_Type": "Professionnel", "Transmission": "Automatique", "Owner": "Second Owner"},
+        {"Brand": "Renault", "Model": "Clio", "Year": None, "KM_Driven": "n/a", "Fuel": "Essence",
+         "Seller_Type": "Particulier", "Transmission": "Manuelle", "Owner": "First Owner"},
+        {"Brand": "Peugeot", "Model": "208", "Year": 2016, "Fuel": "Diesel",
+         "Transmission": "Manuelle"}
+    ]
+    return cars
+
+
+class InferenceParityTest(unittest.TestCase):
+    KEYS = ("price", "confidence", "rf_prediction", "gb_prediction")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.model_path = os.path.join(cls.tmp_dir.name, "car_price_model.joblib")
+        cls.model = MLModel(model_path=cls.model_path, inference_engine="sklearn")
+        cls.model.train(synthetic_listings())
+        cls.cars = prediction_inputs()
+        cls.reference = cls.model.predict_many(cls.cars)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def assert_parity(self, actual: list):
+        self.assertEqual(len(actual), len(self.reference))
+        for key in self.KEYS:
+            expected_values = np.array([r[key] for r in self.reference])
+            actual_values = np.array([r[key] for r in actual])
+            np.testing.assert_allclose(actual_values, expected_values, rtol=1e-9, atol=0, err_msg=key)
+
+    def test_fast_path_matches_pipeline(self):
+        self.assertIsNotNone(self.model.fast_path)
+        self.assert_parity([self.model.predict_fast(car) for car in self.cars])
+
+    def test_unknown_categories_are_encoded_like_the_pipeline(self):
+        encoder = self.model.fast_path['rf']['encoder']
+        preprocessor = self.model.fast_path['rf']['preprocessor']
+        frame = self.model.preprocess_data(pd.DataFrame(self.cars), is_training=False)
+        for c in self.model.feature_columns:
+            if c not in frame.columns:
+                frame[c] = 0
+        expected = preprocessor.transform(frame[self.model.feature_columns])
+        actual = np.vstack([encoder.encode(car) for car in self.cars])
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_compiled_engine_matches_pipeline(self):
+        model = MLModel(model_path=self.model_path, inference_engine="compiled")
+        self.assertIsNotNone(model.compiled)
+        self.assert_parity(model.predict_many(self.cars))
+        self.assert_parity([model.predict_fast(car) for car in self.cars])
+
+    def test_exported_ensemble_round_trip(self):
+        path = MLModel(model_path=self.model_path, inference_engine="compiled").export_compiled()
+        self.addCleanup(os.remove, path)
+        self.assertEqual(path, self.model.compiled_model_path)
+
+        # Loading must read the exported arrays rather than recompile the trees
+        with mock.patch.object(CompiledEnsemble, "from_model", side_effect=AssertionError("recompiled")):
+            model = MLModel(model_path=self.model_path, inference_engine="compiled")
+        self.assertTrue(model.is_loaded())
+        self.assertIsNotNone(model.compiled)
+        self.assert_parity(model.predict_many(self.cars))
+        self.assert_parity([model.predict_fast(car) for car in self.cars])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,17 +4,34 @@ Used Cars Scraping API - FastAPI endpoints for real-time scraping
 """
 
 import asyncio
-import subprocess
 import json
 import os
+import io
 import csv
+import hmac
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from typing import Optional, List, Dict, AsyncIterator, Literal
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from models.ml_model import MLModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from models.ml_model import MLModel, DEFAULT_MODEL_PATH, compiled_model_path
+from models.prediction_cache import PredictionCache
+from models.price_grid import load_fresh_grid, FIRST_YEAR, KM_BUCKETS, GRID_PATH
+from utils.catalog_index import NewCarsIndex, ListingIndex, encode_json
+from utils.catalog_responses import PrecomputedResponse
+from utils.catalog_store import load_fresh_catalog, ColumnarCatalog, CATALOG_PATH, BRANDS_JSON, CARS_JSON, NEW_CARS_CSV
+from utils.serving_data import ServingData
+from utils.scrape_jobs import ScrapeJob, ScrapeJobRegistry
+from scrapers.crawler_service import CrawlerService
+from config.config import (
+    CATALOG_CACHE_MAX_AGE, DATA_RELOAD_INTERVAL, ADMIN_TOKEN, MAX_UPLOAD_SIZE, MAX_BATCH_PREDICTIONS, INFERENCE_ENGINE,
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_KM_BUCKET,
+    SCRAPING_TIMEOUT, SCRAPY_WORKERS, SCRAPE_MAX_CONCURRENT_JOBS, SCRAPE_MAX_PENDING_JOBS, SCRAPE_JOB_TTL,
+    CACHE_TTL, SCRAPE_CACHE_STALE_TTL
+)
 import pandas as pd
 
 app = FastAPI(title="Morocco Used Cars Scraper API", version="1.0.0")
@@ -33,7 +50,7 @@ class SearchRequest(BaseModel):
     model: Optional[str] = None
     max_price: Optional[int] = None
     city: Optional[str] = None
-    source: str = "both"  # "avito", "facebook", or "both"
+    source: Literal["avito", "facebook", "both"] = "both"
 
 class UsedCar(BaseModel):
     brand: str
@@ -60,47 +77,169 @@ class PredictionRequest(BaseModel):
     seller_type: Optional[str] = "Individual"
     owner: Optional[str] = "First Owner"
 
-# Global storage for scraped results
-scraped_results = []
-scraping_status = {"status": "idle", "progress": 0, "message": ""}
+# Background scrape jobs, one per /search-cars request
+scrape_jobs = ScrapeJobRegistry(
+    max_concurrent=SCRAPE_MAX_CONCURRENT_JOBS, max_pending=SCRAPE_MAX_PENDING_JOBS, ttl=SCRAPE_JOB_TTL,
+    cache_ttl=CACHE_TTL, stale_ttl=SCRAPE_CACHE_STALE_TTL
+)
 
-# Global ML model and data storage
-ml_model = None
-brands_data = None
-cars_data = None
-new_cars_data = None
+# Scrapy workers, spawned on the first crawl and reused by every job after it
+crawler_service = CrawlerService(str(Path(__file__).parent / "scrapy_project"), workers=SCRAPY_WORKERS)
 
-# Load data on startup
-def load_data():
-    global brands_data, cars_data, ml_model, new_cars_data
-    try:
-        # Load brands data
-        with open("data/json/morocco_brands_clean.json", "r", encoding="utf-8") as f:
-            brands_data = json.load(f)
-        
+# Catalog indexes and ML model, filled in by the background load started with the server
+# and replaced as a whole by each reload
+serving = ServingData()
+reload_lock = asyncio.Lock()
+background_tasks = []
+
+# Files a reload picks up changes from
+DATA_FILES = (BRANDS_JSON, CARS_JSON, NEW_CARS_CSV, CATALOG_PATH,
+              DEFAULT_MODEL_PATH, compiled_model_path(DEFAULT_MODEL_PATH), GRID_PATH)
+
+def load_brands(data: ServingData, catalog: Optional[ColumnarCatalog]):
+    if catalog is not None:
+        brand_names = catalog.brand_names
+    else:
+        with open(BRANDS_JSON, "r", encoding="utf-8") as f:
+            brand_names = [brand["name"] for brand in json.load(f).get("brands", [])]
+    data.responses.set_brands(brand_names)
+
+def load_cars(data: ServingData, catalog: Optional[ColumnarCatalog]):
+    if catalog is not None:
+        brand_models = catalog.brand_models()
+        cars_data = catalog.listing_data(ListingIndex.PER_MODEL_LIMIT)
+    else:
         # Load cars data (includes models)
-        with open("data/json/morocco_cars_clean.json", "r", encoding="utf-8") as f:
+        with open(CARS_JSON, "r", encoding="utf-8") as f:
             cars_data = json.load(f)
-            
-        # Initialize ML model
-        ml_model = MLModel()
-        
-        # Load new cars CSV data
-        csv_path = "data/csv/morocco_new_cars.csv"
-        if os.path.exists(csv_path):
-            new_cars_data = pd.read_csv(csv_path)
-            print(f"✅ New cars CSV loaded: {len(new_cars_data)} cars")
-        else:
-            print(f"⚠️  CSV file not found: {csv_path}")
-            
-        print("✅ Data and ML model loaded successfully")
-    except Exception as e:
-        print(f"❌ Error loading data: {e}")
-        brands_data = {"brands": []}
-        cars_data = {"brands": {}, "models": {}}
+        brand_models = {brand_name: list(models) for brand_name, models in cars_data.get("models", {}).items()}
+    data.responses.set_models(brand_models)
+    data.cars_index = ListingIndex(cars_data)
+
+def load_new_cars(data: ServingData, catalog: Optional[ColumnarCatalog]):
+    if catalog is not None:
+        new_cars_data = catalog.new_cars_frame()
+        records_json = catalog.new_cars_records_json
+    elif os.path.exists(NEW_CARS_CSV):
+        new_cars_data = pd.read_csv(NEW_CARS_CSV)
+        records_json = None
+    else:
+        new_cars_data = None
+    if new_cars_data is None:
+        # A failed phase, so a reload cannot swap in a generation without new cars
+        raise FileNotFoundError(f"CSV file not found: {NEW_CARS_CSV}")
+    data.new_cars_index = NewCarsIndex(new_cars_data, records_json=records_json)
+    data.responses.set_new_cars(new_cars_data)
+    print(f"✅ New cars loaded: {len(new_cars_data)} cars")
+
+def load_model(data: ServingData):
+    data.prediction_cache = PredictionCache(
+        maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL, km_bucket=PREDICTION_CACHE_KM_BUCKET
+    ) if PREDICTION_CACHE_SIZE > 0 else None
+    ml_model = MLModel(inference_engine=INFERENCE_ENGINE, prediction_cache=data.prediction_cache)
+    # MLModel logs and carries on untrained when the artifact is missing or unreadable (e.g. half written)
+    if not ml_model.is_loaded():
+        raise RuntimeError(f"No trained model could be loaded from {ml_model.model_path}")
+    data.ml_model = ml_model
+    
+    # Depreciation curves precomputed by `python -m models.price_grid`
+    data.price_grid = load_fresh_grid(ml_model.model_path)
+    if data.price_grid is None:
+        print("⚠️  No up-to-date price grid, /predict/curve will predict live")
+
+def empty_cars(data: ServingData):
+    data.responses.set_models({})
+    data.cars_index = ListingIndex({"models": {}})
+
+async def load_data(data: ServingData):
+    """Load every phase, the model in parallel with the catalog data"""
+    async def load_catalog_data():
+        # Compiled by `python -m utils.catalog_store`; typed columns load without any parsing
+        catalog = await data.run_phase("catalog", load_fresh_catalog)
+        if catalog is None:
+            print("⚠️  No up-to-date compiled catalog, loading the JSON and CSV sources")
+        # Brands come first, so /brands is served while the rest is still loading
+        await asyncio.gather(
+            data.run_phase("brands", load_brands, data, catalog, fallback=lambda: data.responses.set_brands([])),
+            data.run_phase("cars", load_cars, data, catalog, fallback=lambda: empty_cars(data)),
+            data.run_phase("new_cars", load_new_cars, data, catalog),
+        )
 
-# Load data on import
-load_data()
+    start = time.perf_counter()
+    await asyncio.gather(load_catalog_data(), data.run_phase("model", load_model, data))
+    phases = ", ".join(f"{name} {phase['seconds'] * 1000:.1f} ms" for name, phase in data.phases.items())
+    print(f"✅ Data and ML model loaded in {(time.perf_counter() - start) * 1000:.1f} ms ({phases})")
+
+def require_phase(data: ServingData, phase: str):
+    """503 until a load phase has finished"""
+    if not data.finished(phase):
+        raise HTTPException(status_code=503, detail=f"Still loading {phase} data", headers={"Retry-After": "1"})
+
+async def initial_load():
+    async with reload_lock:
+        await load_data(serving)
+
+async def reload_data() -> Dict:
+    """Load a new generation off the request path, then swap it in
+
+    Requests already running keep the generation they started with. A phase that fails
+    where the current generation succeeded keeps the current generation in place.
+    """
+    global serving
+    async with reload_lock:
+        current = serving
+        data = ServingData(generation=current.generation + 1)
+        await load_data(data)
+
+        regressed = [name for name in data.failed_phases() if name not in current.failed_phases()]
+        if regressed:
+            print(f"❌ Reload aborted, keeping generation {current.generation}: {', '.join(regressed)} failed")
+            return {"reloaded": False, "failed": regressed, **data.status()}
+
+        serving = data
+        print(f"🔄 Reloaded data and ML model (generation {data.generation})")
+        return {"reloaded": True, **data.status()}
+
+def data_files_signature() -> tuple:
+    """Modification time and size of every data file, None for a missing one"""
+    signature = []
+    for path in DATA_FILES:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+async def watch_data_files(interval: int):
+    """Reload whenever a catalog file or model artifact changes"""
+    seen = data_files_signature()
+    while True:
+        await asyncio.sleep(interval)
+        current = data_files_signature()
+        if current == seen:
+            continue
+        # A file may still be half written; a failed reload is retried on the next check
+        result = await reload_data()
+        if result["reloaded"]:
+            seen = current
+
+@app.on_event("startup")
+async def start_loading():
+    # Load in the background so the server accepts connections (and answers /ready) immediately
+    background_tasks.append(asyncio.create_task(initial_load()))
+    if DATA_RELOAD_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(watch_data_files(DATA_RELOAD_INTERVAL)))
+
+def serve_precomputed(request: Request, precomputed: PrecomputedResponse) -> Response:
+    """Serve a pre-serialized body, answering conditional requests with 304"""
+    headers = {
+        "ETag": precomputed.etag,
+        "Cache-Control": f"public, max-age={CATALOG_CACHE_MAX_AGE}"
+    }
+    if precomputed.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=precomputed.body, media_type="application/json", headers=headers)
 
 @app.get("/")
 async def root():
@@ -111,95 +250,309 @@ async def root():
             "brands": "/brands",
             "models": "/brands/{brand}/models", 
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
+            "predict_curve": "/predict/curve",
+            "predict_cache_stats": "/predict/cache-stats",
             "search": "/search",
             "new_cars_brands": "/new-cars/brands",
             "new_cars_models": "/new-cars/brands/{brand}/models",
             "new_cars_search": "/new-cars/search",
             "search-cars": "/search-cars",
-            "status": "/scraping-status",
-            "results": "/scraped-results"
+            "status": "/scraping-status/{task_id}",
+            "results": "/scraped-results/{task_id}",
+            "stream": "/search-cars/{task_id}/stream",
+            "health": "/health",
+            "ready": "/ready",
+            "reload": "/admin/reload"
         }
     }
 
+@app.get("/health")
+async def health():
+    """Liveness: the server is up, whether or not loading has finished"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness, with the status and duration of every load phase"""
+    status = serving.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.post("/admin/reload")
+async def trigger_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload the catalog files and model artifact without restarting the server
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Reloading is disabled: no ADMIN_TOKEN is configured")
+    if not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    result = await reload_data()
+    return JSONResponse(status_code=200 if result["reloaded"] else 500, content=result)
+
 @app.get("/brands")
-async def get_brands():
+async def get_brands(request: Request):
     """Get all available car brands"""
-    if not brands_data:
+    data = serving
+    require_phase(data, "brands")
+    if data.responses.brands is None:
         raise HTTPException(status_code=500, detail="Brands data not loaded")
     
-    return {
-        "brands": [brand["name"] for brand in brands_data.get("brands", [])]
-    }
+    return serve_precomputed(request, data.responses.brands)
 
 @app.get("/brands/{brand}/models")
-async def get_models_for_brand(brand: str):
+async def get_models_for_brand(brand: str, request: Request):
     """Get all models for a specific brand"""
-    if not cars_data:
+    data = serving
+    require_phase(data, "cars")
+    if data.cars_index is None:
         raise HTTPException(status_code=500, detail="Cars data not loaded")
     
-    brand_upper = brand.upper()
-    brand_models = cars_data.get("models", {}).get(brand_upper, {})
-    
-    models = list(brand_models.keys())
-    
+    return serve_precomputed(request, data.responses.brand_models(brand))
+
+def prediction_input(request: PredictionRequest) -> Dict:
+    """Map a prediction request onto the columns the ML model was trained on"""
     return {
-        "models": [{"name": model} for model in models]
+        "Brand": request.brand,
+        "Model": request.model,
+        "Year": request.year,
+        "KM_Driven": request.km_driven,
+        "Fuel": request.fuel_type,
+        "Transmission": request.transmission,
+        "Seller_Type": request.seller_type,
+        "Owner": request.owner
+    }
+
+def prediction_response(result: Dict) -> Dict:
+    """Shape one ML model result for the API"""
+    return {
+        "predicted_price": result["price"],
+        "confidence": result["confidence"],
+        "currency": "MAD",
+        "model_info": {
+            "rf_prediction": result.get("rf_prediction"),
+            "gb_prediction": result.get("gb_prediction")
+        }
     }
 
 @app.post("/predict")
 async def predict_car_price(request: PredictionRequest):
     """Predict car price using ML model"""
-    if not ml_model:
+    data = serving
+    require_phase(data, "model")
+    if not data.ml_model:
         raise HTTPException(status_code=500, detail="ML model not loaded")
     
     try:
-        # Prepare data for prediction
-        car_data = {
-            "Brand": request.brand,
-            "Model": request.model,
-            "Year": request.year,
-            "KM_Driven": request.km_driven,
-            "Fuel": request.fuel_type,
-            "Transmission": request.transmission,
-            "Seller_Type": request.seller_type,
-            "Owner": request.owner
-        }
-        
         # Make prediction
-        result = ml_model.predict(car_data)
+        result = data.ml_model.predict(prediction_input(request))
         
-        return {
-            "predicted_price": result["price"],
-            "confidence": result["confidence"],
-            "currency": "MAD",
-            "model_info": {
-                "rf_prediction": result.get("rf_prediction"),
-                "gb_prediction": result.get("gb_prediction")
+        return prediction_response(result)
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+@app.get("/predict/curve")
+async def predict_price_curve(brand: str, model: str, fuel_type: str, transmission: str,
+                              axis: str = "year", year: Optional[int] = None, km_driven: Optional[int] = None):
+    """
+    Price vs. year (at a fixed km_driven) or price vs. mileage (at a fixed year)
+    """
+    if axis not in ("year", "km"):
+        raise HTTPException(status_code=400, detail="axis must be 'year' or 'km'")
+    if axis == "year" and km_driven is None:
+        raise HTTPException(status_code=400, detail="km_driven is required for a price vs. year curve")
+    if axis == "km" and year is None:
+        raise HTTPException(status_code=400, detail="year is required for a price vs. mileage curve")
+    
+    data = serving
+    require_phase(data, "model")
+    points = None
+    if data.price_grid is not None:
+        if axis == "year":
+            points = data.price_grid.year_curve(brand, model, fuel_type, transmission, km_driven)
+        else:
+            points = data.price_grid.km_curve(brand, model, fuel_type, transmission, year)
+    source = "grid"
+    
+    # Off-grid inputs fall back to one live batch prediction over the curve points
+    if points is None:
+        if not data.ml_model:
+            raise HTTPException(status_code=500, detail="ML model not loaded")
+        
+        source = "live"
+        if axis == "year":
+            grid_points = list(range(FIRST_YEAR, datetime.now().year + 1))
+        else:
+            grid_points = KM_BUCKETS
+        cars = [
+            {
+                "Brand": brand,
+                "Model": model,
+                "Year": point if axis == "year" else year,
+                "KM_Driven": km_driven if axis == "year" else point,
+                "Fuel": fuel_type,
+                "Transmission": transmission,
+                "Seller_Type": "Individual",
+                "Owner": "First Owner"
             }
+            for point in grid_points
+        ]
+        try:
+            results = await asyncio.to_thread(data.ml_model.predict_many, cars)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+        
+        key = "year" if axis == "year" else "km_driven"
+        points = [{key: point, "price": result["price"]} for point, result in zip(grid_points, results)]
+    
+    return {
+        "brand": brand,
+        "model": model,
+        "fuel_type": fuel_type,
+        "transmission": transmission,
+        "axis": axis,
+        "points": points,
+        "source": source,
+        "currency": "MAD"
+    }
+
+@app.get("/predict/cache-stats")
+async def get_prediction_cache_stats():
+    """
+    Hit/miss counters of the prediction cache
+    """
+    prediction_cache = serving.prediction_cache
+    if prediction_cache is None:
+        return {"enabled": False}
+    
+    return {"enabled": True, **prediction_cache.stats()}
+
+def payload_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Batch payload exceeds {MAX_UPLOAD_SIZE} bytes")
+
+async def read_limited_body(request: Request) -> bytes:
+    """Read the request body in chunks, giving up as soon as it exceeds MAX_UPLOAD_SIZE"""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_UPLOAD_SIZE:
+            raise payload_too_large()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def read_batch_rows(request: Request) -> List[Dict]:
+    """Read raw car rows from a JSON list, NDJSON or CSV body, or a multipart file upload"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    
+    # Refuse declared oversized bodies before reading any of them
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE:
+        raise payload_too_large()
+    
+    if content_type == "multipart/form-data":
+        # Starlette spools uploaded files to disk, so only the file we keep is read into memory
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'file' upload")
+        if upload.size is not None and upload.size > MAX_UPLOAD_SIZE:
+            raise payload_too_large()
+        raw = await upload.read()
+        filename = (upload.filename or "").lower()
+        if filename.endswith(".csv"):
+            content_type = "text/csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            content_type = "application/x-ndjson"
+        else:
+            content_type = (upload.content_type or "").lower()
+    else:
+        raw = await read_limited_body(request)
+    
+    if len(raw) > MAX_UPLOAD_SIZE:
+        raise payload_too_large()
+    
+    text = raw.decode("utf-8-sig")
+    
+    if content_type in ("text/csv", "application/csv"):
+        # Empty cells fall back to the request defaults
+        return [
+            {key: value for key, value in row.items() if value not in ("", None)}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    payload = json.loads(text)
+    if isinstance(payload, dict):
+        payload = payload.get("cars", [])
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Expected a list of cars")
+    return payload
+
+@app.post("/predict/batch")
+async def predict_car_prices_batch(request: Request):
+    """
+    Predict prices for many cars at once (JSON list, NDJSON or CSV, as body or file upload)
+    """
+    data = serving
+    require_phase(data, "model")
+    if not data.ml_model:
+        raise HTTPException(status_code=500, detail="ML model not loaded")
+    
+    try:
+        rows = await read_batch_rows(request)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch payload: {str(e)}")
+    
+    if len(rows) > MAX_BATCH_PREDICTIONS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_PREDICTIONS} cars")
+    
+    cars = []
+    for index, row in enumerate(rows):
+        try:
+            cars.append(PredictionRequest(**row))
+        except (ValidationError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid car at row {index}: {str(e)}")
+    
+    if not cars:
+        return {"predictions": [], "total": 0, "currency": "MAD"}
+    
+    try:
+        # One preprocessing pass and one predict call per model for the whole batch
+        results = await asyncio.to_thread(data.ml_model.predict_many, [prediction_input(car) for car in cars])
+        
+        return {
+            "predictions": [prediction_response(result) for result in results],
+            "total": len(results),
+            "currency": "MAD"
         }
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
 @app.get("/new-cars/brands")
-async def get_new_car_brands():
+async def get_new_car_brands(request: Request):
     """Get all available brands for new cars from CSV"""
-    if new_cars_data is None:
+    data = serving
+    require_phase(data, "new_cars")
+    if data.responses.new_cars_brands is None:
         raise HTTPException(status_code=500, detail="New cars data not loaded")
     
-    brands = sorted(new_cars_data['Brand'].unique().tolist())
-    return {"brands": brands}
+    return serve_precomputed(request, data.responses.new_cars_brands)
 
 @app.get("/new-cars/brands/{brand}/models")
-async def get_new_car_models(brand: str):
+async def get_new_car_models(brand: str, request: Request):
     """Get all models for a specific brand from CSV"""
-    if new_cars_data is None:
+    data = serving
+    require_phase(data, "new_cars")
+    if data.responses.new_cars_brands is None:
         raise HTTPException(status_code=500, detail="New cars data not loaded")
     
-    brand_cars = new_cars_data[new_cars_data['Brand'].str.upper() == brand.upper()]
-    models = sorted(brand_cars['Model'].unique().tolist())
-    
-    return {"models": models}
+    return serve_precomputed(request, data.responses.new_cars_brand_models(brand))
 
 @app.get("/new-cars/search")
 async def search_new_cars(brand: Optional[str] = None, model: Optional[str] = None, 
@@ -207,64 +560,32 @@ async def search_new_cars(brand: Optional[str] = None, model: Optional[str] = No
                          min_price: Optional[int] = None, max_price: Optional[int] = None,
                          limit: Optional[int] = 20):
     """Search new cars from CSV data"""
-    if new_cars_data is None:
+    data = serving
+    require_phase(data, "new_cars")
+    new_cars_index = data.new_cars_index
+    if new_cars_index is None:
         raise HTTPException(status_code=500, detail="New cars data not loaded")
     
     try:
-        # Start with all data
-        filtered_data = new_cars_data.copy()
-        
-        # Apply filters
-        if brand:
-            filtered_data = filtered_data[filtered_data['Brand'].str.upper() == brand.upper()]
-        
-        if model:
-            filtered_data = filtered_data[filtered_data['Model'].str.contains(model, case=False, na=False)]
-            
-        if fuel:
-            filtered_data = filtered_data[filtered_data['Fuel'].str.upper() == fuel.upper()]
-            
-        if transmission:
-            filtered_data = filtered_data[filtered_data['Transmission'].str.upper() == transmission.upper()]
-            
-        if min_price:
-            filtered_data = filtered_data[filtered_data['Selling_Price'] >= min_price]
-            
-        if max_price:
-            filtered_data = filtered_data[filtered_data['Selling_Price'] <= max_price]
-        
-        # Limit results
-        if limit:
-            filtered_data = filtered_data.head(limit)
-        
-        # Convert to list of dictionaries
-        cars = []
-        for _, row in filtered_data.iterrows():
-            cars.append({
-                "id": f"{row['Brand']}_{row['Model']}_{row['Trim']}".replace(" ", "_"),
-                "brand": row['Brand'],
-                "model": row['Model'],
-                "price": int(row['Selling_Price']),
-                "fuel_type": row['Fuel'],
-                "transmission": row['Transmission'],
-                "trim": row['Trim'],
-                "year": 2024,  # Assuming new cars are 2024
-                "image": f"https://via.placeholder.com/400x300/0066cc/ffffff?text={row['Brand']}+{row['Model']}",
-                "url": f"#/car/{row['Brand']}_{row['Model']}_{row['Trim']}".replace(" ", "_")
-            })
-        
-        return {
-            "cars": cars,
-            "total": len(cars),
-            "search_criteria": {
-                "brand": brand,
-                "model": model,
-                "fuel": fuel,
-                "transmission": transmission,
-                "min_price": min_price,
-                "max_price": max_price
-            }
+        # Resolve filters against the prebuilt index
+        rows = new_cars_index.search(brand=brand, model=model, fuel=fuel, transmission=transmission,
+                                     min_price=min_price, max_price=max_price, limit=limit)
+        
+        # Rows are pre-encoded at load time, so the response is a slice-and-join
+        search_criteria = {
+            "brand": brand,
+            "model": model,
+            "fuel": fuel,
+            "transmission": transmission,
+            "min_price": min_price,
+            "max_price": max_price
         }
+        body = (
+            '{"cars":' + new_cars_index.encode_rows(rows)
+            + ',"total":' + str(len(rows))
+            + ',"search_criteria":' + encode_json(search_criteria) + '}'
+        )
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Search error: {str(e)}")
@@ -273,48 +594,14 @@ async def search_new_cars(brand: Optional[str] = None, model: Optional[str] = No
 async def search_cars_simple(brand: Optional[str] = None, model: Optional[str] = None, 
                            min_price: Optional[int] = None, max_price: Optional[int] = None):
     """Simple car search endpoint"""
-    if not cars_data:
+    data = serving
+    require_phase(data, "cars")
+    if data.cars_index is None:
         raise HTTPException(status_code=500, detail="Cars data not loaded")
     
-    results = []
-    
     try:
-        # Search through the cars data
-        models_data = cars_data.get("models", {})
-        
-        for brand_name, brand_models in models_data.items():
-            # Filter by brand if specified
-            if brand and brand.upper() != brand_name.upper():
-                continue
-                
-            for model_name, cars in brand_models.items():
-                # Filter by model if specified
-                if model and model.lower() not in model_name.lower():
-                    continue
-                    
-                for car in cars[:5]:  # Limit to 5 cars per model
-                    car_price = car.get("price", 0)
-                    
-                    # Filter by price range
-                    if min_price and car_price < min_price:
-                        continue
-                    if max_price and car_price > max_price:
-                        continue
-                        
-                    results.append({
-                        "id": car.get("id"),
-                        "brand": car.get("brand"),
-                        "model": car.get("model"),
-                        "price": car_price,
-                        "year": car.get("year"),
-                        "fuel_type": car.get("fuel_type"),
-                        "transmission": car.get("transmission"),
-                        "url": car.get("url"),
-                        "image": car.get("image")
-                    })
-                    
-        # Limit total results
-        results = results[:20]
+        # Posting lists and price order are prebuilt, so this stops as soon as 20 cars are found
+        results = data.cars_index.search(brand=brand, model=model, min_price=min_price, max_price=max_price)
         
         return {
             "cars": results,
@@ -330,224 +617,212 @@ async def search_cars_simple(brand: Optional[str] = None, model: Optional[str] =
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Search error: {str(e)}")
 
-@app.post("/search-cars")
-async def search_cars(request: SearchRequest, background_tasks: BackgroundTasks):
+@app.post("/search-cars", status_code=202)
+async def search_cars(request: SearchRequest):
     """
     Trigger scraping for specific car criteria
     """
-    global scraping_status
-    
-    if scraping_status["status"] == "running":
-        raise HTTPException(status_code=400, detail="Scraping already in progress")
-    
-    # Clear previous results
-    global scraped_results
-    scraped_results = []
-    
-    # Start scraping in background
-    background_tasks.add_task(run_scraping, request)
-    
-    scraping_status = {
-        "status": "started",
-        "progress": 0,
-        "message": f"Starting search for {request.brand} {request.model}".strip()
-    }
+    job, cache_status = scrape_jobs.submit(request.dict(), lambda job: run_scraping(request, job))
+    if job is None:
+        raise HTTPException(status_code=429, detail="Too many scraping jobs in progress, try again later")
     
     return {
-        "message": "Scraping started",
+        "message": "Cached results" if job.finished else "Scraping started",
+        "task_id": job.id,
+        "status": job.status,
+        "cache": cache_status,
+        "status_url": f"/scraping-status/{job.id}",
+        "results_url": f"/scraped-results/{job.id}",
         "search_criteria": request.dict(),
-        "estimated_time": "2-5 minutes"
+        "estimated_time": f"up to {SCRAPING_TIMEOUT} seconds"
     }
 
-@app.get("/scraping-status")
-async def get_scraping_status():
+def get_scrape_job(task_id: str) -> ScrapeJob:
+    job = scrape_jobs.get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired task_id: {task_id}")
+    return job
+
+@app.get("/scraping-status/{task_id}")
+async def get_scraping_status(task_id: str):
     """
-    Get current scraping status
+    Get the status of one scraping job
     """
-    return scraping_status
+    return get_scrape_job(task_id).status_dict()
 
-@app.get("/scraped-results")
-async def get_scraped_results():
+@app.get("/scraped-results/{task_id}")
+async def get_scraped_results(task_id: str):
     """
-    Get latest scraped results
+    Get the results of one scraping job
     """
+    job = get_scrape_job(task_id)
     return {
-        "total_cars": len(scraped_results),
-        "cars": scraped_results,
+        "task_id": job.id,
+        "status": job.status,
+        "total_cars": len(job.results),
+        "cars": job.results,
         "timestamp": datetime.now().isoformat()
     }
 
-@app.get("/quick-search/{brand}")
-async def quick_search(brand: str, background_tasks: BackgroundTasks):
+@app.get("/search-cars/{task_id}/stream")
+async def stream_scraped_results(task_id: str, request: Request):
+    """
+    Push cleaned listings as the spiders yield them, as Server-Sent Events or NDJSON
+    """
+    job = get_scrape_job(task_id)
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    
+    def encode_event(event: str, data: Dict) -> str:
+        if sse:
+            return f"event: {event}\ndata: {encode_json(data)}\n\n"
+        return encode_json({"event": event, "data": data}) + "\n"
+    
+    async def events():
+        async for car in job.follow():
+            yield encode_event("car", car)
+        yield encode_event("done", job.status_dict())
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/scraping-status")
+async def get_latest_scraping_status():
+    """
+    Get the status of the most recently started scraping job
+    """
+    job = scrape_jobs.latest_job()
+    if job is None:
+        return {"status": "idle", "progress": 0, "message": ""}
+    return job.status_dict()
+
+@app.get("/scraped-results")
+async def get_latest_scraped_results():
+    """
+    Get the results of the most recently started scraping job
+    """
+    job = scrape_jobs.latest_job()
+    if job is None:
+        return {"total_cars": 0, "cars": [], "timestamp": datetime.now().isoformat()}
+    return await get_scraped_results(job.id)
+
+@app.get("/quick-search/{brand}", status_code=202)
+async def quick_search(brand: str):
     """
     Quick search for a specific brand
     """
     request = SearchRequest(brand=brand, source="both")
-    return await search_cars(request, background_tasks)
+    return await search_cars(request)
 
-@app.get("/quick-search/{brand}/{model}")
-async def quick_search_with_model(brand: str, model: str, background_tasks: BackgroundTasks):
+@app.get("/quick-search/{brand}/{model}", status_code=202)
+async def quick_search_with_model(brand: str, model: str):
     """
     Quick search for specific brand and model
     """
     request = SearchRequest(brand=brand, model=model, source="both")
-    return await search_cars(request, background_tasks)
+    return await search_cars(request)
 
-async def run_scraping(request: SearchRequest):
+async def run_scraping(request: SearchRequest, job: ScrapeJob):
     """
     Run the actual scraping process
     """
-    global scraping_status, scraped_results
+    # Build spider arguments
+    spider_kwargs = {}
+    if request.brand:
+        spider_kwargs["brand"] = request.brand
+    if request.model:
+        spider_kwargs["model"] = request.model
+    if request.max_price:
+        spider_kwargs["max_price"] = str(request.max_price)
+    if request.city:
+        spider_kwargs["city"] = request.city
     
-    scraping_status = {
-        "status": "running",
-        "progress": 10,
-        "message": "Initializing scrapers..."
-    }
+    spiders = {}
+    if request.source in ["avito", "both"]:
+        spiders["avito"] = "Avito"
+    if request.source in ["facebook", "both"]:
+        spiders["facebook_marketplace"] = "Facebook Marketplace"
     
-    try:
-        # Build scrapy command arguments
-        base_args = []
-        if request.brand:
-            base_args.extend(["-a", f"brand={request.brand}"])
-        if request.model:
-            base_args.extend(["-a", f"model={request.model}"])
-        if request.max_price:
-            base_args.extend(["-a", f"max_price={request.max_price}"])
-        if request.city:
-            base_args.extend(["-a", f"city={request.city}"])
-        
-        scraped_items = []
-        
-        # Run Avito spider
-        if request.source in ["avito", "both"]:
-            scraping_status["message"] = "Scraping Avito..."
-            scraping_status["progress"] = 25
-            
-            avito_results = await run_spider("avito", base_args)
-            scraped_items.extend(avito_results)
-            
-        # Run Facebook spider  
-        if request.source in ["facebook", "both"]:
-            scraping_status["message"] = "Scraping Facebook Marketplace..."
-            scraping_status["progress"] = 60
-            
-            facebook_results = await run_spider("facebook_marketplace", base_args)
-            scraped_items.extend(facebook_results)
-        
-        # Process and clean results
-        scraping_status["message"] = "Processing results..."
-        scraping_status["progress"] = 85
-        
-        scraped_results = process_scraped_data(scraped_items)
-        
-        # Complete
-        scraping_status = {
-            "status": "completed",
-            "progress": 100,
-            "message": f"Found {len(scraped_results)} cars"
-        }
-        
-    except Exception as e:
-        scraping_status = {
-            "status": "error",
-            "progress": 0,
-            "message": f"Error: {str(e)}"
-        }
+    # Fan the sources out concurrently, each bounded by SCRAPING_TIMEOUT
+    job.update(25, f"Scraping {' and '.join(spiders.values())}...")
+    
+    async def run_source(spider_name: str):
+        # Listings are cleaned and published one by one, as the spider yields them
+        found = 0
+        try:
+            async for item in stream_spider(spider_name, spider_kwargs, timeout=SCRAPING_TIMEOUT):
+                cleaned_item = clean_scraped_item(item)
+                if cleaned_item and job.publish(cleaned_item):
+                    found += 1
+        except Exception as e:
+            print(f"Error running spider {spider_name}: {e}")
+            job.errors[spiders[spider_name]] = str(e) or type(e).__name__
+        return spider_name, found
+    
+    done = []
+    for finished in asyncio.as_completed([run_source(spider_name) for spider_name in spiders]):
+        spider_name, found = await finished
+        done.append(f"{spiders[spider_name]}: {found}")
+        
+        # Merge each source as it arrives so partial results are visible while the others run
+        job.results = sorted(job.stream, key=lambda x: x['price'])
+        job.update(25 + 60 * len(done) // len(spiders), f"Scraped {', '.join(done)}")
+    
+    failed = "; ".join(f"{source}: {error}" for source, error in job.errors.items())
+    if len(job.errors) == len(spiders):
+        job.finish("error", f"Error: {failed}", progress=0)
+    elif job.errors:
+        job.finish("completed", f"Found {len(job.results)} cars (failed: {failed})")
+    else:
+        job.finish("completed", f"Found {len(job.results)} cars")
 
-async def run_spider(spider_name: str, args: List[str]) -> List[Dict]:
+async def stream_spider(spider_name: str, spider_kwargs: Dict[str, str],
+                        timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+    """
+    Run a specific scrapy spider on the warm crawler workers and yield its items as they are scraped
+    """
+    async for item in crawler_service.crawl(spider_name, spider_kwargs, timeout):
+        yield item
+
+async def run_spider(spider_name: str, spider_kwargs: Dict[str, str], timeout: Optional[float] = None) -> List[Dict]:
     """
     Run a specific scrapy spider and return results
     """
     try:
-        # Change to scrapy project directory
-        scrapy_dir = Path(__file__).parent / "scrapy_project"
-        
-        # Build scrapy command
-        cmd = ["scrapy", "crawl", spider_name] + args + ["-o", f"temp_{spider_name}.json"]
-        
-        # Run scrapy as subprocess
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=str(scrapy_dir),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        # Read results from temporary JSON file
-        temp_file = scrapy_dir / f"temp_{spider_name}.json"
-        results = []
-        
-        if temp_file.exists():
-            try:
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    results = json.load(f)
-                temp_file.unlink()  # Delete temp file
-            except json.JSONDecodeError:
-                # Try reading as JSONL (line-by-line JSON)
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                results.append(json.loads(line))
-                            except json.JSONDecodeError:
-                                continue
-                temp_file.unlink()
-        
-        return results
-        
+        return [item async for item in stream_spider(spider_name, spider_kwargs, timeout)]
     except Exception as e:
         print(f"Error running spider {spider_name}: {e}")
         return []
 
-def process_scraped_data(raw_items: List[Dict]) -> List[Dict]:
+def clean_scraped_item(item: Dict) -> Optional[Dict]:
     """
-    Clean and process scraped data
+    Validate and normalize one scraped listing, or None if it is unusable
     """
-    processed_items = []
-    
-    for item in raw_items:
-        # Basic validation
-        if not item.get('price') or item.get('price') < 10000:
-            continue
-            
-        if not item.get('brand') or not item.get('model'):
-            continue
-            
-        # Clean and structure data
-        cleaned_item = {
-            'brand': str(item.get('brand', '')).upper().strip(),
-            'model': str(item.get('model', '')).upper().strip(), 
-            'year': item.get('year'),
-            'price': int(item.get('price', 0)),
-            'mileage': int(item.get('mileage', 0)),
-            'fuel_type': str(item.get('fuel_type', 'ESSENCE')).upper(),
-            'transmission': str(item.get('transmission', 'MANUELLE')).upper(),
-            'city': str(item.get('city', '')).title(),
-            'url': str(item.get('url', '')),
-            'phone': item.get('phone'),
-            'description': str(item.get('description', ''))[:200],  # Limit description length
-            'source': str(item.get('source', '')),
-            'images': item.get('images', [])[:3] if item.get('images') else []
-        }
+    # Basic validation
+    if not item.get('price') or item.get('price') < 10000:
+        return None
         
-        processed_items.append(cleaned_item)
-    
-    # Remove duplicates based on URL
-    seen_urls = set()
-    unique_items = []
-    
-    for item in processed_items:
-        if item['url'] not in seen_urls:
-            seen_urls.add(item['url'])
-            unique_items.append(item)
-    
-    # Sort by price (ascending)
-    unique_items.sort(key=lambda x: x['price'])
-    
-    return unique_items
+    if not item.get('brand') or not item.get('model'):
+        return None
+        
+    # Clean and structure data
+    return {
+        'brand': str(item.get('brand', '')).upper().strip(),
+        'model': str(item.get('model', '')).upper().strip(), 
+        'year': item.get('year'),
+        'price': int(item.get('price', 0)),
+        'mileage': int(item.get('mileage', 0)),
+        'fuel_type': str(item.get('fuel_type', 'ESSENCE')).upper(),
+        'transmission': str(item.get('transmission', 'MANUELLE')).upper(),
+        'city': str(item.get('city', '')).title(),
+        'url': str(item.get('url', '')),
+        'phone': item.get('phone'),
+        'description': str(item.get('description', ''))[:200],  # Limit description length
+        'source': str(item.get('source', '')),
+        'images': item.get('images', [])[:3] if item.get('images') else []
+    }
 
 @app.get("/test-scrapers")
 async def test_scrapers():
@@ -556,14 +831,8 @@ async def test_scrapers():
     """
     try:
         # Test with a simple BMW search
-        request = SearchRequest(brand="BMW", source="avito")
-        
-        global scraped_results, scraping_status
-        scraped_results = []
-        scraping_status = {"status": "testing", "progress": 0, "message": "Testing scrapers..."}
-        
         # Run a quick test
-        avito_results = await run_spider("avito", ["-a", "brand=BMW"])
+        avito_results = await run_spider("avito", {"brand": "BMW"}, timeout=SCRAPING_TIMEOUT)
         
         return {
             "status": "success",
@@ -579,6 +848,10 @@ async def test_scrapers():
             "suggestion": "Make sure Scrapy is installed: pip install scrapy"
         }
 
+@app.on_event("shutdown")
+def stop_crawler_service():
+    crawler_service.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
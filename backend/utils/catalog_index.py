@@ -0,0 +1,211 @@
+"""
+Prebuilt in-memory indexes over the catalog data served by the API
+"""
+
+import json
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def encode_json(value) -> str:
+    """Encode exactly like FastAPI's default JSONResponse"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+class NewCarsIndex:
+    """Columnar index over the new cars CSV for filtered searches"""
+
+    CATEGORICAL_COLUMNS = ('Brand', 'Fuel', 'Transmission')
+
+    def __init__(self, df: pd.DataFrame, records_json: Optional[np.ndarray] = None):
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+
+        # Categorical columns: upper-cased value -> code, plus one bitmap per code
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        self.bitmaps: Dict[str, List[np.ndarray]] = {}
+        for column in self.CATEGORICAL_COLUMNS:
+            codes, uniques = pd.factorize(self.df[column].astype(str).str.upper())
+            self.codes[column] = codes.astype(np.int32)
+            self.vocab[column] = {value: code for code, value in enumerate(uniques)}
+            self.bitmaps[column] = [self.codes[column] == code for code in range(len(uniques))]
+
+        # Models are matched by pattern, so keep one bitmap per distinct name
+        model_codes, model_names = pd.factorize(self.df['Model'].astype(str))
+        self.model_names: List[str] = list(model_names)
+        self.model_bitmaps = [model_codes == code for code in range(len(model_names))]
+
+        # Prices sorted once; range filters become two binary searches
+        prices = self.df['Selling_Price'].to_numpy()
+        self.price_order = np.argsort(prices, kind='stable')
+        self.sorted_prices = prices[self.price_order]
+
+        # Search results are served from pre-encoded JSON fragments, one per row
+        # (the compiled catalog ships them, so only a CSV load encodes them here)
+        self.records_json = records_json if records_json is not None else self._encode_records()
+
+    def _encode_records(self) -> np.ndarray:
+        """Derive the response fields once and encode every row as a JSON object"""
+        df = self.df
+        slug = (df['Brand'].astype(str) + '_' + df['Model'].astype(str) + '_' + df['Trim'].astype(str)).str.replace(' ', '_')
+        records = pd.DataFrame({
+            'id': slug,
+            'brand': df['Brand'],
+            'model': df['Model'],
+            'price': df['Selling_Price'].astype(int),
+            'fuel_type': df['Fuel'],
+            'transmission': df['Transmission'],
+            'trim': df['Trim'],
+            'year': 2024,  # Assuming new cars are 2024
+            'image': 'https://via.placeholder.com/400x300/0066cc/ffffff?text=' + df['Brand'].astype(str) + '+' + df['Model'].astype(str),
+            'url': '#/car/' + slug,
+        })
+        encoded = [encode_json(record) for record in records.to_dict('records')]
+        return np.array(encoded, dtype=object)
+
+    def encode_rows(self, rows: np.ndarray) -> str:
+        """Return the JSON array of the given rows"""
+        return '[' + ','.join(self.records_json[rows]) + ']'
+
+    def _categorical_bitmap(self, column: str, value: str) -> Optional[np.ndarray]:
+        code = self.vocab[column].get(value.upper())
+        if code is None:
+            return None
+        return self.bitmaps[column][code]
+
+    def _model_bitmap(self, model: str) -> Optional[np.ndarray]:
+        # Same semantics as Series.str.contains(model, case=False), but over distinct names only
+        pattern = re.compile(model, re.IGNORECASE)
+        matching = [bitmap for name, bitmap in zip(self.model_names, self.model_bitmaps) if pattern.search(name)]
+        if not matching:
+            return None
+        return np.logical_or.reduce(matching)
+
+    def _price_bitmap(self, min_price: Optional[int], max_price: Optional[int]) -> np.ndarray:
+        lo = np.searchsorted(self.sorted_prices, min_price, side='left') if min_price else 0
+        hi = np.searchsorted(self.sorted_prices, max_price, side='right') if max_price else self.size
+        bitmap = np.zeros(self.size, dtype=bool)
+        bitmap[self.price_order[lo:hi]] = True
+        return bitmap
+
+    def search(self, brand: Optional[str] = None, model: Optional[str] = None,
+               fuel: Optional[str] = None, transmission: Optional[str] = None,
+               min_price: Optional[int] = None, max_price: Optional[int] = None,
+               limit: Optional[int] = None) -> np.ndarray:
+        """Return the row positions matching all filters, in catalog order"""
+        bitmaps = []
+
+        for column, value in (('Brand', brand), ('Fuel', fuel), ('Transmission', transmission)):
+            if value:
+                bitmap = self._categorical_bitmap(column, value)
+                if bitmap is None:
+                    return np.empty(0, dtype=np.intp)
+                bitmaps.append(bitmap)
+
+        if model:
+            bitmap = self._model_bitmap(model)
+            if bitmap is None:
+                return np.empty(0, dtype=np.intp)
+            bitmaps.append(bitmap)
+
+        if min_price or max_price:
+            bitmaps.append(self._price_bitmap(min_price, max_price))
+
+        if not bitmaps:
+            rows = np.arange(self.size)
+        else:
+            rows = np.flatnonzero(np.logical_and.reduce(bitmaps))
+
+        if limit:
+            rows = rows[:limit]
+        return rows
+
+
+class ListingIndex:
+    """Flat listing table compiled from the nested cars JSON for /search"""
+
+    PER_MODEL_LIMIT = 5
+    RESULT_LIMIT = 20
+
+    def __init__(self, cars_data: Dict):
+        self.records: List[Dict] = []
+        prices: List[int] = []
+
+        # Every brand/model pair is one contiguous group of rows, in catalog order
+        self.group_bounds: List[tuple] = []
+        self.group_models: List[str] = []
+        self.brand_groups: Dict[str, List[int]] = {}
+
+        for brand_name, brand_models in cars_data.get("models", {}).items():
+            for model_name, cars in brand_models.items():
+                start = len(self.records)
+                # Only the first few cars of each model are ever listed
+                for car in cars[:self.PER_MODEL_LIMIT]:
+                    car_price = car.get("price", 0)
+                    self.records.append({
+                        "id": car.get("id"),
+                        "brand": car.get("brand"),
+                        "model": car.get("model"),
+                        "price": car_price,
+                        "year": car.get("year"),
+                        "fuel_type": car.get("fuel_type"),
+                        "transmission": car.get("transmission"),
+                        "url": car.get("url"),
+                        "image": car.get("image")
+                    })
+                    prices.append(car_price or 0)
+
+                self.brand_groups.setdefault(brand_name.upper(), []).append(len(self.group_bounds))
+                self.group_bounds.append((start, len(self.records)))
+                self.group_models.append(model_name.lower())
+
+        self.prices = np.array(prices, dtype=np.int64)
+        self.price_order = np.argsort(self.prices, kind='stable')
+        self.sorted_prices = self.prices[self.price_order]
+
+    def _price_mask(self, prices: np.ndarray, min_price: Optional[int], max_price: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(prices), dtype=bool)
+        if min_price:
+            mask &= prices >= min_price
+        if max_price:
+            mask &= prices <= max_price
+        return mask
+
+    def _rows_by_price(self, min_price: Optional[int], max_price: Optional[int], limit: int) -> np.ndarray:
+        """First rows (in catalog order) inside the price range, via the sorted price array"""
+        lo = np.searchsorted(self.sorted_prices, min_price, side='left') if min_price else 0
+        hi = np.searchsorted(self.sorted_prices, max_price, side='right') if max_price else len(self.sorted_prices)
+        candidates = self.price_order[lo:hi]
+        if len(candidates) > limit:
+            candidates = np.partition(candidates, limit - 1)[:limit]
+        return np.sort(candidates)
+
+    def search(self, brand: Optional[str] = None, model: Optional[str] = None,
+               min_price: Optional[int] = None, max_price: Optional[int] = None,
+               limit: int = RESULT_LIMIT) -> List[Dict]:
+        """Return up to `limit` listings matching the filters, in catalog order"""
+        if not brand and not model:
+            return [self.records[i] for i in self._rows_by_price(min_price, max_price, limit)]
+
+        if brand:
+            groups = self.brand_groups.get(brand.upper(), [])
+        else:
+            groups = range(len(self.group_bounds))
+
+        needle = model.lower() if model else None
+        rows: List[int] = []
+        for group in groups:
+            if needle and needle not in self.group_models[group]:
+                continue
+            start, end = self.group_bounds[group]
+            matches = np.flatnonzero(self._price_mask(self.prices[start:end], min_price, max_price))
+            rows.extend(start + matches)
+            # Stop as soon as enough listings are found
+            if len(rows) >= limit:
+                break
+
+        return [self.records[i] for i in rows[:limit]]
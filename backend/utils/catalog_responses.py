@@ -0,0 +1,80 @@
+"""
+Immutable, pre-serialized response bodies for the catalog lookup endpoints
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.catalog_index import encode_json
+
+
+class PrecomputedResponse:
+    """A JSON body encoded once, with its strong ETag"""
+
+    def __init__(self, content):
+        self.body = encode_json(content).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against this body's ETag"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            # If-None-Match uses weak comparison
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == self.etag:
+                return True
+        return False
+
+
+class CatalogResponses:
+    """Every /brands and /new-cars/brands response, built once per data load
+
+    Each group of bodies is built in full before it is published, so the groups can be filled in
+    from separate load phases while requests are being served.
+    """
+
+    def __init__(self, brand_names: Optional[List[str]] = None, brand_models: Optional[Dict[str, List[str]]] = None,
+                 new_cars_data: Optional[pd.DataFrame] = None):
+        self.empty_models = PrecomputedResponse({"models": []})
+        self.brands = None
+        self.models: Dict[str, PrecomputedResponse] = {}
+        self.new_cars_brands = None
+        self.new_cars_models: Dict[str, PrecomputedResponse] = {}
+
+        if brand_names is not None:
+            self.set_brands(brand_names)
+        if brand_models:
+            self.set_models(brand_models)
+        if new_cars_data is not None:
+            self.set_new_cars(new_cars_data)
+
+    def set_brands(self, brand_names: List[str]):
+        self.brands = PrecomputedResponse({"brands": brand_names})
+
+    def set_models(self, brand_models: Dict[str, List[str]]):
+        self.models = {
+            brand_name: PrecomputedResponse({"models": [{"name": model} for model in model_names]})
+            for brand_name, model_names in brand_models.items()
+        }
+
+    def set_new_cars(self, new_cars_data: pd.DataFrame):
+        self.new_cars_models = {
+            brand_upper: PrecomputedResponse({"models": sorted(brand_cars['Model'].unique().tolist())})
+            for brand_upper, brand_cars in new_cars_data.groupby(new_cars_data['Brand'].str.upper())
+        }
+        self.new_cars_brands = PrecomputedResponse({
+            "brands": sorted(new_cars_data['Brand'].unique().tolist())
+        })
+
+    def brand_models(self, brand: str) -> PrecomputedResponse:
+        return self.models.get(brand.upper(), self.empty_models)
+
+    def new_cars_brand_models(self, brand: str) -> PrecomputedResponse:
+        return self.new_cars_models.get(brand.upper(), self.empty_models)
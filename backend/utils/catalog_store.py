@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Compiled columnar catalog: the clean brands/cars JSON and the new cars CSV as typed NumPy arrays
+
+Build it from backend/ with: python -m utils.catalog_store
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CATALOG_PATH = "data/catalog.npz"
+BRANDS_JSON = "data/json/morocco_brands_clean.json"
+CARS_JSON = "data/json/morocco_cars_clean.json"
+NEW_CARS_CSV = "data/csv/morocco_new_cars.csv"
+FORMAT_VERSION = 1
+
+# Listing fields read by ListingIndex, by storage type
+LISTING_INT_FIELDS = ('id', 'price', 'year')
+LISTING_STRING_FIELDS = ('brand', 'model', 'fuel_type', 'transmission', 'url', 'image')
+
+
+class StringTable:
+    """Distinct strings referenced by int32 codes, -1 standing for null
+
+    Stored as one UTF-8 blob plus character offsets, so every string column of the catalog
+    shares a single decode.
+    """
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = values if values is not None else []
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, values) -> np.ndarray:
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+            elif isinstance(value, str):
+                code = self.codes.get(value)
+                if code is None:
+                    code = self.codes[value] = len(self.values)
+                    self.values.append(value)
+                codes[i] = code
+            else:
+                raise ValueError(f"Expected a string or null, got {value!r}")
+        return codes
+
+    def decode(self, codes: np.ndarray) -> List[Optional[str]]:
+        values = self.values
+        return [values[code] if code >= 0 else None for code in codes.tolist()]
+
+    def pack(self) -> Dict[str, np.ndarray]:
+        offsets = np.zeros(len(self.values) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in self.values], out=offsets[1:])
+        blob = np.frombuffer(''.join(self.values).encode('utf-8'), dtype=np.uint8)
+        return {"strings": blob, "string_offsets": offsets}
+
+    @classmethod
+    def unpack(cls, blob: np.ndarray, offsets: np.ndarray) -> 'StringTable':
+        text = blob.tobytes().decode('utf-8')
+        bounds = offsets.tolist()
+        return cls([text[start:end] for start, end in zip(bounds, bounds[1:])])
+
+
+def encode_ints(values: List[Optional[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """int64 values plus a null mask"""
+    for value in values:
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"Expected an integer or null, got {value!r}")
+    nulls = np.array([value is None for value in values], dtype=bool)
+    return np.array([value or 0 for value in values], dtype=np.int64), nulls
+
+
+class ColumnarCatalog:
+    """Everything load_data() needs from the catalog files, held as a few NumPy arrays
+
+    - brand_names: codes of the brands JSON names
+    - groups: one (brand, model, start, end) row per model of the cars JSON; brand and model are
+      codes, start:end the model's run of car rows
+    - car_strings / car_ints / car_nulls: the listing fields of every car, one row per field
+    - new_cars_*: the new cars CSV columns in file order, plus each row's pre-encoded search result
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], strings: StringTable):
+        self.arrays = arrays
+        self.strings = strings
+
+    @classmethod
+    def compile(cls, brands_path: str = BRANDS_JSON, cars_path: str = CARS_JSON,
+                new_cars_path: str = NEW_CARS_CSV) -> 'ColumnarCatalog':
+        """Build the arrays from the JSON and CSV sources"""
+        from utils.catalog_index import NewCarsIndex
+
+        with open(brands_path, "r", encoding="utf-8") as f:
+            brands_data = json.load(f)
+        with open(cars_path, "r", encoding="utf-8") as f:
+            cars_data = json.load(f)
+
+        strings = StringTable()
+        arrays: Dict[str, np.ndarray] = {"format_version": np.array(FORMAT_VERSION)}
+        arrays["brand_names"] = strings.encode([brand["name"] for brand in brands_data.get("brands", [])])
+
+        groups: List[Tuple[int, int, int, int]] = []
+        cars: List[Dict[str, Any]] = []
+        for brand_name, brand_models in cars_data.get("models", {}).items():
+            brand_code = int(strings.encode([brand_name])[0])
+            for model_name, model_cars in brand_models.items():
+                groups.append((brand_code, int(strings.encode([model_name])[0]), len(cars), len(cars) + len(model_cars)))
+                cars.extend(model_cars)
+        arrays["groups"] = np.array(groups, dtype=np.int64).reshape(-1, 4)
+
+        # Same defaults as ListingIndex reads from the JSON: a missing price is 0, other fields None
+        ints = [encode_ints([car.get(field, 0 if field == 'price' else None) for car in cars])
+                for field in LISTING_INT_FIELDS]
+        arrays["car_ints"] = np.array([values for values, _ in ints]).reshape(len(ints), len(cars))
+        arrays["car_nulls"] = np.array([nulls for _, nulls in ints]).reshape(len(ints), len(cars))
+        arrays["car_strings"] = np.array(
+            [strings.encode([car.get(field) for car in cars]) for field in LISTING_STRING_FIELDS]
+        ).reshape(len(LISTING_STRING_FIELDS), len(cars))
+
+        if os.path.exists(new_cars_path):
+            new_cars = pd.read_csv(new_cars_path)
+            arrays["new_cars_columns"] = strings.encode(list(new_cars.columns))
+            for column in new_cars.columns:
+                series = new_cars[column]
+                if series.dtype == object:
+                    arrays[f"new_cars.{column}"] = strings.encode(series.tolist())
+                elif series.dtype.kind in "if":
+                    arrays[f"new_cars.{column}.numeric"] = series.to_numpy()
+                else:
+                    raise ValueError(f"Unsupported dtype {series.dtype} for new cars column {column}")
+            arrays["new_cars_records_json"] = strings.encode(NewCarsIndex(new_cars).records_json.tolist())
+
+        return cls(arrays, strings)
+
+    def save(self, path: str = CATALOG_PATH):
+        # Uncompressed, so loading is a straight read of each member
+        np.savez(path, **self.arrays, **self.strings.pack())
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> 'ColumnarCatalog':
+        with np.load(path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        strings = StringTable.unpack(arrays.pop("strings"), arrays.pop("string_offsets"))
+        return cls(arrays, strings)
+
+    def is_current(self) -> bool:
+        return int(self.arrays["format_version"]) == FORMAT_VERSION
+
+    @property
+    def brand_names(self) -> List[str]:
+        return self.strings.decode(self.arrays["brand_names"])
+
+    def brand_models(self) -> Dict[str, List[str]]:
+        """Model names of each brand, in cars JSON order"""
+        groups = self.arrays["groups"]
+        models: Dict[str, List[str]] = {}
+        for brand_name, model_name in zip(self.strings.decode(groups[:, 0]), self.strings.decode(groups[:, 1])):
+            models.setdefault(brand_name, []).append(model_name)
+        return models
+
+    def listing_data(self, per_model_limit: int) -> Dict[str, Any]:
+        """The cars JSON shape ListingIndex reads, with only the first cars of each model"""
+        groups = self.arrays["groups"]
+        # Decode just the rows that will be listed
+        ends = np.minimum(groups[:, 3], groups[:, 2] + per_model_limit)
+        lengths = ends - groups[:, 2]
+        rows = np.arange(lengths.sum()) + np.repeat(groups[:, 2] - (np.cumsum(lengths) - lengths), lengths)
+
+        columns: Dict[str, List] = {}
+        for i, field in enumerate(LISTING_INT_FIELDS):
+            values = self.arrays["car_ints"][i, rows].tolist()
+            nulls = self.arrays["car_nulls"][i, rows].tolist()
+            columns[field] = [None if null else value for value, null in zip(values, nulls)]
+        for i, field in enumerate(LISTING_STRING_FIELDS):
+            columns[field] = self.strings.decode(self.arrays["car_strings"][i, rows])
+        records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+        models: Dict[str, Dict[str, List[Dict]]] = {}
+        position = 0
+        for brand_name, model_name, start, end in zip(self.strings.decode(groups[:, 0]), self.strings.decode(groups[:, 1]),
+                                                      groups[:, 2].tolist(), ends.tolist()):
+            models.setdefault(brand_name, {})[model_name] = records[position:position + end - start]
+            position += end - start
+        return {"models": models}
+
+    def new_cars_frame(self) -> Optional[pd.DataFrame]:
+        """The new cars CSV as read by pandas, or None if it was missing at compile time"""
+        if "new_cars_columns" not in self.arrays:
+            return None
+        data = {}
+        for column in self.strings.decode(self.arrays["new_cars_columns"]):
+            if f"new_cars.{column}" in self.arrays:
+                data[column] = pd.Series(self.strings.decode(self.arrays[f"new_cars.{column}"]), dtype=object)
+            else:
+                data[column] = self.arrays[f"new_cars.{column}.numeric"]
+        return pd.DataFrame(data)
+
+    @property
+    def new_cars_records_json(self) -> Optional[np.ndarray]:
+        if "new_cars_records_json" not in self.arrays:
+            return None
+        return np.array(self.strings.decode(self.arrays["new_cars_records_json"]), dtype=object)
+
+
+def load_fresh_catalog(path: str = CATALOG_PATH,
+                       sources: Tuple[str, ...] = (BRANDS_JSON, CARS_JSON, NEW_CARS_CSV)) -> Optional[ColumnarCatalog]:
+    """Load the catalog unless it is missing, older than one of its sources, or in another format"""
+    if not os.path.exists(path):
+        return None
+    built = os.path.getmtime(path)
+    if any(os.path.exists(source) and os.path.getmtime(source) > built for source in sources):
+        return None
+    catalog = ColumnarCatalog.load(path)
+    return catalog if catalog.is_current() else None
+
+
+def main():
+    """Compile the catalog sources into the columnar file read at API startup"""
+    catalog_path = sys.argv[1] if len(sys.argv) > 1 else CATALOG_PATH
+
+    start = time.time()
+    catalog = ColumnarCatalog.compile()
+    catalog.save(catalog_path)
+
+    arrays = catalog.arrays
+    print("🗜️  COLUMNAR CATALOG BUILDER")
+    print(f"   🏷️  {len(arrays['brand_names'])} brands, {len(arrays['groups'])} models, "
+          f"{arrays['car_ints'].shape[1]} cars, {len(arrays.get('new_cars_records_json', []))} new cars")
+    print(f"   🔤 {len(catalog.strings.values)} distinct strings")
+    print(f"💾 Catalog saved to {catalog_path} ({os.path.getsize(catalog_path) // 1024} KiB in {time.time() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
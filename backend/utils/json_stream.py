@@ -0,0 +1,124 @@
+"""
+Pull reader for large JSON files: walk objects and arrays, decoding only the values asked for
+"""
+
+import json
+import re
+from typing import Any, Iterator
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Everything up to the next bracket outside a string; stops at the quote of an unterminated string
+NON_BRACKETS = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+SCALAR_END = re.compile(r'[ \t\n\r,\]}]')
+
+
+class JsonStreamReader:
+    """Reads a JSON document in chunks, holding only the current chunk and the value being decoded
+
+    iter_object() yields each key and iter_array() yields before each element; the caller must
+    consume that value (read_value, skip_value, or a nested iter_*) before advancing.
+    """
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.file = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next value in full"""
+        if self._peek() not in '{["':
+            # A number or literal is only complete once a delimiter follows it
+            while not SCALAR_END.search(self.buffer, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """Step over the next value without decoding it"""
+        if self._peek() not in "{[":
+            self.read_value()
+            return
+
+        depth = 0
+        while True:
+            self.pos = NON_BRACKETS.match(self.buffer, self.pos).end()
+            if self.pos == len(self.buffer) or self.buffer[self.pos] == '"':
+                # Out of text, or a string that continues in the next chunk
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON")
+                continue
+
+            char = self.buffer[self.pos]
+            self.pos += 1
+            depth += 1 if char in "{[" else -1
+            if depth == 0:
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the next object, leaving each value to the caller"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self.pos - 1}, found {separator!r}")
+
+    def iter_array(self) -> Iterator[None]:
+        """Yield once per element of the next array, leaving each element to the caller"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self._peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1}, found {separator!r}")
@@ -2,15 +2,33 @@
 """
 📊 KIFAL DATA PROCESSOR
 Process scraped Kifal.ma data into clean, structured formats
+
+Run from backend/: python -m utils.process_kifal_data [--stream]
 """
 
 import json
 import csv
+import os
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 
+from scrapers.listing_text import extract_listing_details
+from utils.json_stream import JsonStreamReader
+
+# Price ranges reported in the metadata, in categorize_price_range order
+PRICE_RANGES = ['Moins de 200k', '200k - 300k', '300k - 500k', '500k - 800k', '800k - 1.5M', 'Plus de 1.5M']
+
+# Brand categories listed in the brands JSON
+BRAND_CATEGORIES = ['premium', 'generaliste', 'chinese', 'electric']
+
+CSV_FIELDS = [
+    'id', 'brand', 'model', 'price', 'price_range', 'year',
+    'engine', 'fuel_type', 'transmission', 'url', 'source'
+]
+
 class KifalDataProcessor:
     """Process and clean scraped Kifal.ma data"""
     
@@ -22,6 +40,12 @@ class KifalDataProcessor:
             "cars": [],
             "metadata": {}
         }
+        # Running aggregates, updated as brands and cars are added
+        self.price_range_counts = {range_name: 0 for range_name in PRICE_RANGES}
+        self.brands_by_category: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.model_count = 0
+        # Per-brand model/car counts and price bounds, filled in streaming mode
+        self.brand_summaries: Dict[str, Dict[str, Any]] = {}
         
     def load_scraped_data(self) -> Dict[str, Any]:
         """Load scraped data from JSON file"""
@@ -105,35 +129,14 @@ class KifalDataProcessor:
         """Extract detailed car information from model data"""
         raw_text = model_data.get('raw_text', '')
         
-        # Extract year
-        year_match = re.search(r'20\d{2}', raw_text)
-        year = int(year_match.group()) if year_match else None
-        
-        # Extract engine info
-        engine_match = re.search(r'(\d+\.\d+|\d+)\s*(L|l|TSI|TDI|HDI|DCI)', raw_text, re.IGNORECASE)
-        engine = engine_match.group().upper() if engine_match else None
-        
-        # Extract fuel type
-        fuel_types = ['ESSENCE', 'DIESEL', 'HYBRID', 'ELECTRIQUE', 'GPL']
-        fuel_type = None
-        for fuel in fuel_types:
-            if fuel.lower() in raw_text.lower():
-                fuel_type = fuel
-                break
-        
-        # Extract transmission
-        if any(term in raw_text.upper() for term in ['AUTO', 'AUTOMATIQUE', 'CVT', 'DSG']):
-            transmission = 'AUTOMATIQUE'
-        elif any(term in raw_text.upper() for term in ['MANUEL', 'MANUELLE', 'MT']):
-            transmission = 'MANUELLE'
-        else:
-            transmission = None
+        # Year, engine, fuel type and transmission in one scan of the text
+        details = extract_listing_details(raw_text)
         
         return {
-            'year': year,
-            'engine': engine,
-            'fuel_type': fuel_type,
-            'transmission': transmission,
+            'year': details['year'],
+            'engine': details['engine'],
+            'fuel_type': details['fuel_type'],
+            'transmission': details['transmission'],
             'raw_text': raw_text
         }
     
@@ -155,112 +158,106 @@ class KifalDataProcessor:
         else:
             return 'Plus de 1.5M'
     
+    def add_brand(self, brand_name: str, brand_info: Dict[str, Any]):
+        """Add a cleaned brand and file it under its category"""
+        clean_name = self.clean_brand_name(brand_name)
+        brand = {
+            'name': clean_name,
+            'original_name': brand_name,
+            'category': brand_info.get('category', 'generaliste'),
+            'image': brand_info.get('image'),
+            'url': brand_info.get('url')
+        }
+        
+        previous = self.clean_data['brands'].get(clean_name)
+        if previous is not None and previous['category'] != brand['category']:
+            del self.brands_by_category[previous['category']][clean_name]
+        self.clean_data['brands'][clean_name] = brand
+        self.brands_by_category.setdefault(brand['category'], {})[clean_name] = brand
+    
+    def model_cars(self, brand_name: str, model_name: str) -> List[Dict[str, Any]]:
+        """Car list of a clean model, created and counted on first use"""
+        brand_models = self.clean_data['models'].setdefault(brand_name, {})
+        if model_name not in brand_models:
+            brand_models[model_name] = []
+            self.model_count += 1
+        return brand_models[model_name]
+    
+    def build_car(self, car_id: int, brand_name: str, model_name: str, variation: Dict[str, Any],
+                  scraped_at: Optional[str]) -> Dict[str, Any]:
+        """Create a clean car entry from a scraped variation and count it in the price histogram"""
+        # Extract car details
+        details = self.extract_car_details(variation)
+        price_range = self.categorize_price_range(variation.get('price'))
+        
+        car_entry = {
+            'id': car_id,
+            'brand': brand_name,
+            'model': model_name,
+            'price': variation.get('price'),
+            'price_range': price_range,
+            'year': details['year'],
+            'engine': details['engine'],
+            'fuel_type': details['fuel_type'],
+            'transmission': details['transmission'],
+            'url': variation.get('url'),
+            'image': variation.get('image'),
+            'source': 'kifal.ma',
+            'scraped_at': scraped_at
+        }
+        
+        if price_range in self.price_range_counts:
+            self.price_range_counts[price_range] += 1
+        
+        return car_entry
+    
+    def add_car(self, brand_name: str, model_name: str, variation: Dict[str, Any],
+                scraped_at: Optional[str]) -> Dict[str, Any]:
+        """Create a clean car entry and keep it in clean_data"""
+        model_cars = self.model_cars(brand_name, model_name)
+        car_entry = self.build_car(len(self.clean_data['cars']) + 1, brand_name, model_name, variation, scraped_at)
+        self.clean_data['cars'].append(car_entry)
+        model_cars.append(car_entry)
+        return car_entry
+    
     def process_data(self) -> Dict[str, Any]:
         """Process and clean the scraped data"""
         print("🔄 Processing scraped Kifal.ma data...")
         
         raw_data = self.load_scraped_data()
+        scraped_at = raw_data.get('metadata', {}).get('scraped_at')
         
         # Process brands
         for brand_name, brand_info in raw_data.get('brands', {}).items():
-            clean_name = self.clean_brand_name(brand_name)
-            self.clean_data['brands'][clean_name] = {
-                'name': clean_name,
-                'original_name': brand_name,
-                'category': brand_info.get('category', 'generaliste'),
-                'image': brand_info.get('image'),
-                'url': brand_info.get('url')
-            }
+            self.add_brand(brand_name, brand_info)
         
         # Process models and cars
-        car_id = 1
         for brand_name, brand_models in raw_data.get('models', {}).items():
             clean_brand_name = self.clean_brand_name(brand_name)
-            
-            if clean_brand_name not in self.clean_data['models']:
-                self.clean_data['models'][clean_brand_name] = {}
+            self.clean_data['models'].setdefault(clean_brand_name, {})
             
             for model_name, model_variations in brand_models.items():
                 # If the model_name looks like a location/address, extract model per variation
                 if self.is_location_string(model_name):
                     for variation in model_variations:
                         derived_model = self.extract_model_from_variation(variation)
-                        clean_model_name = self.clean_model_name(derived_model)
-
-                        if clean_model_name not in self.clean_data['models'][clean_brand_name]:
-                            self.clean_data['models'][clean_brand_name][clean_model_name] = []
-
-                        # Extract car details
-                        details = self.extract_car_details(variation)
-
-                        car_entry = {
-                            'id': car_id,
-                            'brand': clean_brand_name,
-                            'model': clean_model_name,
-                            'price': variation.get('price'),
-                            'price_range': self.categorize_price_range(variation.get('price')),
-                            'year': details['year'],
-                            'engine': details['engine'],
-                            'fuel_type': details['fuel_type'],
-                            'transmission': details['transmission'],
-                            'url': variation.get('url'),
-                            'image': variation.get('image'),
-                            'source': 'kifal.ma',
-                            'scraped_at': raw_data.get('metadata', {}).get('scraped_at')
-                        }
-
-                        self.clean_data['cars'].append(car_entry)
-                        self.clean_data['models'][clean_brand_name][clean_model_name].append(car_entry)
-
-                        car_id += 1
+                        self.add_car(clean_brand_name, self.clean_model_name(derived_model), variation, scraped_at)
                 else:
                     clean_model_name = self.clean_model_name(model_name)
-                    
-                    if clean_model_name not in self.clean_data['models'][clean_brand_name]:
-                        self.clean_data['models'][clean_brand_name][clean_model_name] = []
+                    self.model_cars(clean_brand_name, clean_model_name)
                     
                     for variation in model_variations:
-                        # Extract car details
-                        details = self.extract_car_details(variation)
-                        
-                        # Create clean car entry
-                        car_entry = {
-                            'id': car_id,
-                            'brand': clean_brand_name,
-                            'model': clean_model_name,
-                            'price': variation.get('price'),
-                            'price_range': self.categorize_price_range(variation.get('price')),
-                            'year': details['year'],
-                            'engine': details['engine'],
-                            'fuel_type': details['fuel_type'],
-                            'transmission': details['transmission'],
-                            'url': variation.get('url'),
-                            'image': variation.get('image'),
-                            'source': 'kifal.ma',
-                            'scraped_at': raw_data.get('metadata', {}).get('scraped_at')
-                        }
-                        
-                        self.clean_data['cars'].append(car_entry)
-                        self.clean_data['models'][clean_brand_name][clean_model_name].append(car_entry)
-                        
-                        car_id += 1
+                        self.add_car(clean_brand_name, clean_model_name, variation, scraped_at)
         
-        # Update metadata
+        # Update metadata from the running aggregates
         self.clean_data['metadata'] = {
             'processed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'source': 'kifal.ma',
-            'original_scrape_time': raw_data.get('metadata', {}).get('scraped_at'),
+            'original_scrape_time': scraped_at,
             'total_brands': len(self.clean_data['brands']),
-            'total_models': sum(len(models) for models in self.clean_data['models'].values()),
+            'total_models': self.model_count,
             'total_cars': len(self.clean_data['cars']),
-            'price_ranges': {
-                'Moins de 200k': len([c for c in self.clean_data['cars'] if c['price_range'] == 'Moins de 200k']),
-                '200k - 300k': len([c for c in self.clean_data['cars'] if c['price_range'] == '200k - 300k']),
-                '300k - 500k': len([c for c in self.clean_data['cars'] if c['price_range'] == '300k - 500k']),
-                '500k - 800k': len([c for c in self.clean_data['cars'] if c['price_range'] == '500k - 800k']),
-                '800k - 1.5M': len([c for c in self.clean_data['cars'] if c['price_range'] == '800k - 1.5M']),
-                'Plus de 1.5M': len([c for c in self.clean_data['cars'] if c['price_range'] == 'Plus de 1.5M']),
-            }
+            'price_ranges': dict(self.price_range_counts)
         }
         
         print(f"✅ Processing completed!")
@@ -271,6 +268,179 @@ class KifalDataProcessor:
         
         return self.clean_data
     
+    def load_scraped_header(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Brands and metadata of the scraped JSON, stepping over its models"""
+        brands, metadata = {}, {}
+        with open(self.input_file, 'r', encoding='utf-8') as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key == 'brands':
+                    brands = reader.read_value()
+                elif key == 'metadata':
+                    metadata = reader.read_value()
+                else:
+                    reader.skip_value()
+        return brands, metadata
+    
+    def iter_scraped_models(self) -> Iterator[Tuple[str, Iterator[Tuple[str, List[Dict[str, Any]]]]]]:
+        """Yield (brand, models) from the scraped JSON, where models yields (model, variations)
+        
+        One model is decoded at a time; each brand's models must be consumed before the next brand.
+        """
+        with open(self.input_file, 'r', encoding='utf-8') as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key != 'models':
+                    reader.skip_value()
+                    continue
+                for brand_name in reader.iter_object():
+                    models = ((model_name, reader.read_value()) for model_name in reader.iter_object())
+                    yield brand_name, models
+                    # Step over whatever the caller left unread
+                    for _ in models:
+                        pass
+    
+    def process_stream(self, json_filename: str = "data/json/morocco_cars_clean.json",
+                       csv_filename: str = "data/csv/morocco_cars_clean.csv",
+                       brands_filename: str = "data/json/morocco_brands_clean.json") -> Dict[str, Any]:
+        """Process the scraped data one model at a time, with the same outputs as process_data + save_*
+        
+        Each car is written to the CSV and, already JSON-encoded, to a scratch file as soon as it is
+        built; only its file offset is kept, per clean brand/model. The cars JSON is then assembled
+        from the scratch file in save_json's layout, "models" grouping included.
+        """
+        print(f"🔄 Streaming scraped Kifal.ma data from {self.input_file}...")
+        
+        brands, raw_metadata = self.load_scraped_header()
+        scraped_at = raw_metadata.get('scraped_at')
+        for brand_name, brand_info in brands.items():
+            self.add_brand(brand_name, brand_info)
+        
+        # Clean brand -> clean model -> scratch file offsets of its cars, in process_data order
+        model_offsets: Dict[str, Dict[str, List[int]]] = {}
+        car_count = 0
+        
+        def count_model(brand_name: str, model_name: str) -> Tuple[List[int], Dict[str, Any]]:
+            summary = self.brand_summaries.setdefault(
+                brand_name, {'models': 0, 'cars': 0, 'min_price': None, 'max_price': None})
+            brand_models = model_offsets.setdefault(brand_name, {})
+            if model_name not in brand_models:
+                brand_models[model_name] = []
+                self.model_count += 1
+                summary['models'] += 1
+            return brand_models[model_name], summary
+        
+        Path(json_filename).parent.mkdir(parents=True, exist_ok=True)
+        Path(csv_filename).parent.mkdir(parents=True, exist_ok=True)
+        json_tmp, csv_tmp, cars_tmp = f"{json_filename}.tmp", f"{csv_filename}.tmp", f"{json_filename}.cars.tmp"
+        
+        try:
+            with open(cars_tmp, 'w+b') as cars_file, \
+                    open(csv_tmp, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                
+                for brand_name, brand_models in self.iter_scraped_models():
+                    clean_brand_name = self.clean_brand_name(brand_name)
+                    model_offsets.setdefault(clean_brand_name, {})
+                    
+                    for model_name, model_variations in brand_models:
+                        location = self.is_location_string(model_name)
+                        if not location:
+                            clean_model_name = self.clean_model_name(model_name)
+                            count_model(clean_brand_name, clean_model_name)
+                        
+                        for variation in model_variations:
+                            if location:
+                                # The model_name is an address, so each variation names its own model
+                                clean_model_name = self.clean_model_name(self.extract_model_from_variation(variation))
+                            offsets, summary = count_model(clean_brand_name, clean_model_name)
+                            
+                            car_count += 1
+                            car_entry = self.build_car(car_count, clean_brand_name, clean_model_name, variation, scraped_at)
+                            
+                            # One line per car: its indented JSON with newlines as NUL, which JSON text never contains
+                            offsets.append(cars_file.tell())
+                            encoded = json.dumps(car_entry, indent=2, ensure_ascii=False).replace('\n', '\0')
+                            cars_file.write(encoded.encode('utf-8') + b'\n')
+                            writer.writerow({field: car_entry.get(field, '') for field in CSV_FIELDS})
+                            
+                            summary['cars'] += 1
+                            price = car_entry['price']
+                            if price:
+                                summary['min_price'] = min(price, summary['min_price'] or price)
+                                summary['max_price'] = max(price, summary['max_price'] or price)
+                
+                self.clean_data['metadata'] = {
+                    'processed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    'source': 'kifal.ma',
+                    'original_scrape_time': scraped_at,
+                    'total_brands': len(self.clean_data['brands']),
+                    'total_models': self.model_count,
+                    'total_cars': car_count,
+                    'price_ranges': dict(self.price_range_counts)
+                }
+                
+                with open(json_tmp, 'w', encoding='utf-8') as json_file:
+                    self._write_clean_json(json_file, cars_file, model_offsets)
+            
+            os.replace(json_tmp, json_filename)
+            os.replace(csv_tmp, csv_filename)
+        finally:
+            for path in (cars_tmp, json_tmp, csv_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+        print(f"💾 Clean JSON data streamed to {json_filename}")
+        print(f"📊 Clean CSV data streamed to {csv_filename}")
+        
+        self.save_brands_json(brands_filename)
+        
+        print("✅ Processing completed!")
+        print("📊 Results:")
+        print(f"   🏷️ Brands: {self.clean_data['metadata']['total_brands']}")
+        print(f"   🚗 Models: {self.clean_data['metadata']['total_models']}")
+        print(f"   📋 Cars: {self.clean_data['metadata']['total_cars']}")
+        
+        return self.clean_data
+    
+    def _write_clean_json(self, json_file, cars_file, model_offsets: Dict[str, Dict[str, List[int]]]):
+        """Write clean_data as save_json would, reading the cars back from the scratch file"""
+        def dump(value: Any, depth: int) -> str:
+            # json.dump(indent=2) of a value nested `depth` levels down
+            return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * depth)
+        
+        def read_car(offset: int) -> bytes:
+            cars_file.seek(offset)
+            return cars_file.readline()
+        
+        def write_list(cars: Iterator[bytes], depth: int):
+            indent = '\n' + '  ' * (depth + 1)
+            empty = True
+            for car in cars:
+                json_file.write(('[' if empty else ',') + indent + car.decode('utf-8').rstrip('\n').replace('\0', indent))
+                empty = False
+            json_file.write('[]' if empty else '\n' + '  ' * depth + ']')
+        
+        json_file.write('{\n  "brands": ' + dump(self.clean_data['brands'], 1) + ',\n  "models": ')
+        if not model_offsets:
+            json_file.write('{}')
+        for brand_index, (brand_name, brand_models) in enumerate(model_offsets.items()):
+            json_file.write(('{' if brand_index == 0 else ',') + '\n    ' + dump(brand_name, 0) + ': ')
+            if not brand_models:
+                json_file.write('{}')
+            for model_index, (model_name, offsets) in enumerate(brand_models.items()):
+                json_file.write(('{' if model_index == 0 else ',') + '\n      ' + dump(model_name, 0) + ': ')
+                write_list((read_car(offset) for offset in offsets), 3)
+            if brand_models:
+                json_file.write('\n    }')
+        if model_offsets:
+            json_file.write('\n  }')
+        
+        json_file.write(',\n  "cars": ')
+        cars_file.seek(0)
+        write_list(iter(cars_file), 1)
+        json_file.write(',\n  "metadata": ' + dump(self.clean_data['metadata'], 1) + '\n}')
+    
     def save_json(self, filename: str = "data/json/morocco_cars_clean.json"):
         """Save processed data to JSON"""
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
@@ -284,18 +454,13 @@ class KifalDataProcessor:
         """Save car data to CSV"""
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
         
-        fieldnames = [
-            'id', 'brand', 'model', 'price', 'price_range', 'year', 
-            'engine', 'fuel_type', 'transmission', 'url', 'source'
-        ]
-        
         with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
             writer.writeheader()
             
             for car in self.clean_data['cars']:
                 # Only write relevant fields to CSV
-                csv_row = {field: car.get(field, '') for field in fieldnames}
+                csv_row = {field: car.get(field, '') for field in CSV_FIELDS}
                 writer.writerow(csv_row)
         
         print(f"📊 Clean CSV data saved to {filename}")
@@ -307,16 +472,16 @@ class KifalDataProcessor:
         brands_data = {
             'brands': list(self.clean_data['brands'].values()),
             'categories': {
-                'premium': [b for b in self.clean_data['brands'].values() if b['category'] == 'premium'],
-                'generaliste': [b for b in self.clean_data['brands'].values() if b['category'] == 'generaliste'],
-                'chinese': [b for b in self.clean_data['brands'].values() if b['category'] == 'chinese'],
-                'electric': [b for b in self.clean_data['brands'].values() if b['category'] == 'electric'],
+                category: list(self.brands_by_category.get(category, {}).values())
+                for category in BRAND_CATEGORIES
             },
             'metadata': {
                 'total_brands': len(self.clean_data['brands']),
                 'processed_at': self.clean_data['metadata']['processed_at']
             }
         }
+        if self.brand_summaries:
+            brands_data['summaries'] = self.brand_summaries
         
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(brands_data, f, indent=2, ensure_ascii=False)
@@ -332,13 +497,17 @@ def main():
     processor = KifalDataProcessor()
     
     try:
-        # Process the data
-        clean_data = processor.process_data()
-        
-        # Save in multiple formats
-        processor.save_json()
-        processor.save_csv()
-        processor.save_brands_json()
+        if '--stream' in sys.argv[1:]:
+            # Constant memory: cars are written as they are processed
+            clean_data = processor.process_stream()
+        else:
+            # Process the data
+            clean_data = processor.process_data()
+            
+            # Save in multiple formats
+            processor.save_json()
+            processor.save_csv()
+            processor.save_brands_json()
         
         print()
         print("🎉 DATA PROCESSING COMPLETED!")
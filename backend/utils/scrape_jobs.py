@@ -0,0 +1,219 @@
+"""
+In-memory registry of background scrape jobs, run concurrently up to a fixed limit
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class ScrapeJob:
+    """Status, progress and results of one /search-cars request"""
+
+    FINISHED = ("completed", "error")
+
+    def __init__(self, criteria: Dict[str, Any], key: Optional[tuple] = None):
+        self.id = uuid.uuid4().hex
+        self.criteria = criteria
+        self.key = key
+        self.status = "queued"
+        self.progress = 0
+        self.message = "Waiting for a free scraping slot..."
+        self.results: List[Dict] = []
+        # Source name -> error of each source whose crawl failed
+        self.errors: Dict[str, str] = {}
+        # Cleaned, de-duplicated listings in arrival order, for streaming clients
+        self.stream: List[Dict] = []
+        self._seen_urls = set()
+        self._changed = asyncio.Event()
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self._finished_monotonic: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED
+
+    def _notify(self):
+        # Wake every follower, then arm a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def update(self, progress: int, message: str):
+        self.progress = progress
+        self.message = message
+
+    def publish(self, item: Dict) -> bool:
+        """Append a cleaned listing unless its URL was already seen"""
+        if item['url'] in self._seen_urls:
+            return False
+        self._seen_urls.add(item['url'])
+        self.stream.append(item)
+        self._notify()
+        return True
+
+    def finish(self, status: str, message: str, progress: int = 100):
+        self.status = status
+        self.progress = progress
+        self.message = message
+        self.finished_at = datetime.now().isoformat()
+        self._finished_monotonic = time.monotonic()
+        self._notify()
+
+    async def follow(self) -> AsyncIterator[Dict]:
+        """Yield every streamed listing, past and future, until the job finishes"""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.stream):
+                yield self.stream[sent]
+                sent += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+    def age(self, now: float) -> Optional[float]:
+        """Seconds since the job finished, or None while it is still queued or running"""
+        return None if self._finished_monotonic is None else now - self._finished_monotonic
+
+    def expired(self, ttl: float, now: float) -> bool:
+        return self._finished_monotonic is not None and now - self._finished_monotonic > ttl
+
+    def status_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "search_criteria": self.criteria,
+            "total_cars": len(self.results),
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+def criteria_key(criteria: Dict[str, Any]) -> tuple:
+    """Normalize search criteria so equivalent searches share one cache entry"""
+    def text(value):
+        return " ".join(str(value).split()).upper() if value else None
+
+    max_price = criteria.get("max_price")
+    return (
+        text(criteria.get("brand")),
+        text(criteria.get("model")),
+        int(max_price) if max_price else None,
+        text(criteria.get("city")),
+        (criteria.get("source") or "both").strip().lower()
+    )
+
+
+class ScrapeJobRegistry:
+    """Job id -> ScrapeJob, with a concurrency limit and TTL eviction of finished jobs
+
+    Completed jobs double as a result cache keyed on the normalized criteria: they are served
+    as-is for `cache_ttl` seconds, then for `stale_ttl` more seconds while a background job
+    refreshes them. Identical searches submitted while one is in flight share that job.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_pending: int = 20, ttl: float = 3600,
+                 cache_ttl: float = 900, stale_ttl: float = 900):
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+        self.jobs: Dict[str, ScrapeJob] = {}
+        self.latest: Optional[ScrapeJob] = None
+        # criteria key -> last completed job, and -> job currently queued or running
+        self._completed: Dict[tuple, ScrapeJob] = {}
+        self._in_flight: Dict[tuple, ScrapeJob] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Strong references so running tasks are not garbage collected
+        self._tasks = set()
+
+    def pending(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def evict_expired(self):
+        now = time.monotonic()
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.expired(self.ttl, now)]:
+            del self.jobs[job_id]
+        if self.latest is not None and self.latest.id not in self.jobs:
+            self.latest = None
+        for key in [key for key, job in self._completed.items()
+                    if job.id not in self.jobs or job.expired(self.cache_ttl + self.stale_ttl, now)]:
+            del self._completed[key]
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        self.evict_expired()
+        return self.jobs.get(job_id)
+
+    def latest_job(self) -> Optional[ScrapeJob]:
+        """The most recently submitted job, unless it has expired"""
+        self.evict_expired()
+        return self.latest
+
+    def submit(self, criteria: Dict[str, Any],
+               runner: Callable[[ScrapeJob], Awaitable[None]]) -> Tuple[Optional[ScrapeJob], str]:
+        """Return the job answering these criteria and how it was obtained
+
+        The outcome is "cached" (fresh completed job), "stale" (completed job past cache_ttl,
+        refreshed in the background), "coalesced" (identical job in flight) or "started".
+        The job is None when the queue is full.
+        """
+        self.evict_expired()
+        key = criteria_key(criteria)
+
+        cached = self._completed.get(key)
+        if cached is not None:
+            self.latest = cached
+            if cached.age(time.monotonic()) <= self.cache_ttl:
+                return cached, "cached"
+            if key not in self._in_flight and self.pending() < self.max_pending:
+                self._start(criteria, key, runner)
+            return cached, "stale"
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.latest = in_flight
+            return in_flight, "coalesced"
+
+        if self.pending() >= self.max_pending:
+            return None, "rejected"
+
+        job = self._start(criteria, key, runner)
+        self.latest = job
+        return job, "started"
+
+    def _start(self, criteria: Dict[str, Any], key: tuple, runner: Callable[[ScrapeJob], Awaitable[None]]) -> ScrapeJob:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+
+        job = ScrapeJob(criteria, key)
+        self.jobs[job.id] = job
+        self._in_flight[key] = job
+
+        task = asyncio.create_task(self._run(job, runner))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: ScrapeJob, runner: Callable[[ScrapeJob], Awaitable[None]]):
+        async with self._slots:
+            job.status = "running"
+            job.update(5, "Initializing scrapers...")
+            try:
+                await runner(job)
+                if not job.finished:
+                    job.finish("completed", f"Found {len(job.results)} cars")
+            except Exception as e:
+                job.finish("error", f"Error: {str(e)}", progress=0)
+            finally:
+                self._in_flight.pop(job.key, None)
+
+        # Failed or partly failed crawls are not cached, so the next identical search retries
+        if job.status == "completed" and not job.errors:
+            self._completed[job.key] = job
@@ -0,0 +1,68 @@
+"""
+Catalog indexes and ML model served by the API, loaded in phases in the background
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from models.prediction_cache import PredictionCache
+from models.price_grid import PriceGrid
+from utils.catalog_index import ListingIndex, NewCarsIndex
+from utils.catalog_responses import CatalogResponses
+
+
+class ServingData:
+    """One load of everything the endpoints read, filled in as each load phase finishes
+
+    Phases run in worker threads; an endpoint may read a phase's attributes once
+    finished(phase) is true. A reload builds a whole new ServingData and swaps it in, so
+    endpoints take one reference per request and read everything through it.
+    """
+
+    PHASES = ('catalog', 'brands', 'cars', 'new_cars', 'model')
+
+    def __init__(self, generation: int = 1):
+        self.generation = generation
+        self.responses = CatalogResponses()
+        self.cars_index: Optional[ListingIndex] = None
+        self.new_cars_index: Optional[NewCarsIndex] = None
+        self.ml_model = None
+        self.price_grid: Optional[PriceGrid] = None
+        # Cached predictions belong to the model that made them
+        self.prediction_cache: Optional[PredictionCache] = None
+        self.phases: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in self.PHASES}
+
+    async def run_phase(self, name: str, load: Callable, *args, fallback: Optional[Callable] = None):
+        """Run one phase in a thread and time it; on error, record it and return fallback()"""
+        phase = self.phases[name]
+        phase["status"] = "loading"
+        start = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(load, *args)
+            status = "ready"
+        except Exception as e:
+            print(f"❌ Error loading {name}: {e}")
+            phase["error"] = str(e)
+            result = fallback() if fallback else None
+            status = "failed"
+        phase["seconds"] = round(time.perf_counter() - start, 4)
+        phase["status"] = status
+        return result
+
+    def failed_phases(self) -> List[str]:
+        return [name for name, phase in self.phases.items() if phase["status"] == "failed"]
+
+    def finished(self, name: str) -> bool:
+        return self.phases[name]["status"] in ("ready", "failed")
+
+    @property
+    def ready(self) -> bool:
+        return all(self.finished(name) for name in self.PHASES)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "generation": self.generation,
+            "phases": {name: dict(phase) for name, phase in self.phases.items()}
+        }